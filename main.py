@@ -4,21 +4,24 @@ load_dotenv()
 import os
 import re
 import sqlite3
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import asyncio
-from dateutil.relativedelta import relativedelta
 import random
 import sys
-import google.generativeai as genai
 import logging
-import requests
+import aiohttp
+import orjson
 import html
+import inspect
+import atexit
 import signal
+from collections import deque
+import threading
+import time
 
 # --- Slack Bolt (Socket Mode, no FastAPI) ---
 from slack_bolt.async_app import AsyncApp
 from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from slack_sdk.errors import SlackApiError
 
 # --- Basic Setup ---
@@ -29,8 +32,12 @@ logger = logging.getLogger(__name__)
 def load_word_list(filename):
     """Loads a list of words from a file."""
     try:
-        with open(filename, 'r') as f:
-            words = [line.strip().upper() for line in f if line.strip()]
+        # Word files hold one word per line, so a single split() handles stripping and blank lines.
+        # The games index letters as A-Z, so non-ASCII entries are dropped whole rather than trimmed.
+        with open(filename, 'rb') as f:
+            entries = f.read().decode('utf-8', 'replace').upper().split()
+        words = [sys.intern(word) for word in entries if word.isascii()]
+        if len(words) != len(entries): logger.warning(f"Skipped {len(entries) - len(words)} non-ASCII entries in '{filename}'.")
         if not words:
             logger.critical(f"Word file '{filename}' is empty. The bot cannot function.")
             sys.exit(1)
@@ -41,78 +48,368 @@ def load_word_list(filename):
 
 # --- GAME CONSTANTS & STATE ---
 active_games = {}
-WORDLE_ANSWERS = load_word_list("wordle_answers.txt")
-VALID_GUESSES = set(load_word_list("valid_guesses.txt"))
-VALID_GUESSES.update(WORDLE_ANSWERS)
+# Read-only after load; interning shares one string object between the answer and guess lists.
+WORDLE_ANSWERS = tuple(load_word_list("wordle_answers.txt"))
+VALID_GUESSES = frozenset(load_word_list("valid_guesses.txt")).union(WORDLE_ANSWERS)
 
 # --- Hangman word pool: limit to 5–8 letters ---
 def _load_optional_words(filename):
     try:
-        with open(filename, "r") as f:
-            return [line.strip().upper() for line in f if line.strip()]
+        with open(filename, "rb") as f:
+            return f.read().decode('ascii', 'ignore').upper().split()
     except FileNotFoundError:
         return []
 
-HANGMAN_WORDS = set(w for w in VALID_GUESSES if 5 <= len(w) <= 8)
-HANGMAN_WORDS.update([w for w in _load_optional_words("hangman_words.txt") if 5 <= len(w) <= 8])
+HANGMAN_WORDS = frozenset(w for w in VALID_GUESSES.union(map(sys.intern, _load_optional_words("hangman_words.txt"))) if 5 <= len(w) <= 8)
 
 if not HANGMAN_WORDS:
     logger.warning("No 5–8 letter words found for Hangman; falling back to WORDLE_ANSWERS.")
-    HANGMAN_WORDS = set(WORDLE_ANSWERS)
+    HANGMAN_WORDS = frozenset(WORDLE_ANSWERS)
+# Bucketed once so a game start is a dict lookup instead of a scan over every word.
+_HANGMAN_BY_LEN = {}
+for _w in HANGMAN_WORDS: _HANGMAN_BY_LEN.setdefault(len(_w), []).append(_w)
+_HANGMAN_BY_LEN = {n: tuple(words) for n, words in _HANGMAN_BY_LEN.items()}
+_HANGMAN_POOL = tuple(HANGMAN_WORDS)
+
+# --- GEMINI API (Grok removed) ---
+# google.generativeai pulls in a large module graph, so it is imported and configured on first use.
+_gemini_model = None
+_gemini_initialized = False
+
+def get_gemini_model():
+    """Returns the configured Gemini model, or None if the API could not be set up."""
+    global _gemini_model, _gemini_initialized
+    if not _gemini_initialized:
+        _gemini_initialized = True
+        try:
+            import google.generativeai as genai
+            genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+            _gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+            logger.info("Gemini API configured successfully.")
+        except Exception as e:
+            logger.critical(f"Could not configure Gemini API. Error: {e}")
+    return _gemini_model
 
-# --- INITIALIZE GEMINI API (Grok removed) ---
-try:
-    genai.configure(api_key=os.environ["GEMINI_API_KEY"])
-    gemini_model = genai.GenerativeModel('gemini-1.5-flash')
-    logger.info("Gemini API configured successfully.")
-except Exception as e:
-    logger.critical(f"Could not configure Gemini API. Error: {e}")
-    gemini_model = None
+# Caps in-flight Gemini requests when several celebrations are generated at once.
+GEMINI_CONCURRENCY = 5
+_gemini_sem = asyncio.Semaphore(GEMINI_CONCURRENCY)
+
+async def gemini_generate(model, prompt):
+    async with _gemini_sem:
+        return await model.generate_content_async(prompt)
 
 # --- DATABASE SETUP ---
+DB_PATH = 'slack_bot.db'
+DB = None  # persistent read-write connection, opened by setup_database()
+DB_READ = None  # read-only connection; under WAL its reads don't wait behind writes on DB
+_db_lock = threading.Lock()
+_db_read_lock = threading.Lock()
+
+# --- OUTBOUND HTTP ---
+HTTP = None  # pooled aiohttp session, opened in main()
+
+def _json_dumps(obj):
+    """orjson-backed serializer for aiohttp; Slack modal and message payloads go through it."""
+    return orjson.dumps(obj).decode()
+
+# Schema bootstrap runs as one script: the daily checks look rows up by month-day, so both tables
+# get an index that turns those full scans into lookups.
+SCHEMA_SQL = """
+PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; PRAGMA temp_store=memory; PRAGMA cache_size=-64000;
+CREATE TABLE IF NOT EXISTS birthdays (user_id TEXT PRIMARY KEY, birthday_date TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS anniversaries (user_id TEXT PRIMARY KEY, anniversary_date TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS settings (id INTEGER PRIMARY KEY CHECK (id = 1), bday_channel TEXT, bday_time TEXT, anniv_channel TEXT, anniv_time TEXT, game_enabled INTEGER NOT NULL DEFAULT 0);
+CREATE INDEX IF NOT EXISTS idx_bday_date ON birthdays (birthday_date);
+CREATE INDEX IF NOT EXISTS idx_anniv_mmdd ON anniversaries (SUBSTR(anniversary_date, 6));
+INSERT OR IGNORE INTO settings (id) VALUES (1);
+"""
+
 def setup_database():
-    conn = sqlite3.connect('slack_bot.db'); cursor = conn.cursor()
-    cursor.execute('CREATE TABLE IF NOT EXISTS birthdays (user_id TEXT PRIMARY KEY, birthday_date TEXT NOT NULL)')
-    cursor.execute('CREATE TABLE IF NOT EXISTS anniversaries (user_id TEXT PRIMARY KEY, anniversary_date TEXT NOT NULL)')
-    cursor.execute('CREATE TABLE IF NOT EXISTS settings_birthday (id INTEGER PRIMARY KEY, announcement_channel TEXT, announcement_time TEXT)')
-    cursor.execute('CREATE TABLE IF NOT EXISTS settings_anniversary (id INTEGER PRIMARY KEY, announcement_channel TEXT, announcement_time TEXT)')
-    cursor.execute('CREATE TABLE IF NOT EXISTS settings_game (id INTEGER PRIMARY KEY, enabled INTEGER NOT NULL)')
-    conn.commit(); conn.close()
+    global DB, DB_READ
+    DB = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+    DB.executescript(SCHEMA_SQL)
+    _migrate_legacy_settings()
+    DB_READ = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False, isolation_level=None)
+    DB_READ.execute('PRAGMA cache_size=-64000')
     logger.info("Database setup complete.")
 
+def _migrate_legacy_settings():
+    """Folds the old one-row settings_birthday/settings_anniversary/settings_game tables into `settings`."""
+    tables = {name for (name,) in DB.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    legacy = [('settings_birthday', "UPDATE settings SET bday_channel = ?, bday_time = ? WHERE id = 1", "SELECT announcement_channel, announcement_time FROM settings_birthday WHERE id = 1"),
+              ('settings_anniversary', "UPDATE settings SET anniv_channel = ?, anniv_time = ? WHERE id = 1", "SELECT announcement_channel, announcement_time FROM settings_anniversary WHERE id = 1"),
+              ('settings_game', "UPDATE settings SET game_enabled = ? WHERE id = 1", "SELECT enabled FROM settings_game WHERE id = 1")]
+    for table, update_sql, select_sql in legacy:
+        if table not in tables: continue
+        row = DB.execute(select_sql).fetchone()
+        if row: DB.execute(update_sql, row)
+        DB.execute(f"DROP TABLE {table}")
+        logger.info(f"Migrated legacy table '{table}' into settings.")
+
+# --- SLACK RATE LIMITING ---
+# Slack's per-method rate tiers: method -> (requests/second, burst). chat_postMessage is limited per channel.
+SLACK_METHOD_RATES = {
+    'chat_postMessage': (1.0, 5),
+    'users_info': (100 / 60, 20),  # tier 4
+    'conversations_open': (50 / 60, 20),  # tier 3
+    'users_list': (20 / 60, 3),  # tier 2
+}
+SLACK_DEFAULT_RATE = (20 / 60, 3)  # anything unlisted is held to tier 2
+
+class TokenBucket:
+    """Hands out one token per API call, refilling at `rate` tokens/second up to `burst`."""
+    def __init__(self, rate, burst):
+        self.rate = rate; self.burst = burst
+        self._tokens = burst; self._updated = time.monotonic(); self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate); self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1; return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+            self._tokens = 0; self._updated = time.monotonic()
+
+# Modal trigger_ids expire after 3 seconds and ephemerals answer a user directly, so these never queue.
+SLACK_UNTHROTTLED = frozenset({'chat_postEphemeral'})
+
+def _bucket_key(name, kwargs):
+    if name.startswith('views_') or name in SLACK_UNTHROTTLED: return None
+    return (name, kwargs.get('channel')) if name == 'chat_postMessage' else name  # Slack limits posting per channel
+
+class RateLimitedClient:
+    """Proxies an AsyncWebClient so API calls wait for a token from their own bucket.
+    Buckets are per method (per channel for chat_postMessage) at that method's tier, so bulk DMs can't starve
+    interactive calls.
+    A `ratelimited` error is retried once after Slack's Retry-After delay."""
+    def __init__(self, client, buckets):
+        self._client = client; self._buckets = buckets
+
+    def _bucket(self, key):
+        bucket = self._buckets.get(key)
+        if bucket is None: bucket = self._buckets[key] = TokenBucket(*SLACK_METHOD_RATES.get(key[0] if isinstance(key, tuple) else key, SLACK_DEFAULT_RATE))
+        return bucket
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not inspect.iscoroutinefunction(attr): return attr
+        async def call(*args, **kwargs):
+            key = _bucket_key(name, kwargs)
+            if key is None: return await attr(*args, **kwargs)
+            await self._bucket(key).acquire()
+            try: return await attr(*args, **kwargs)
+            except SlackApiError as e:
+                if e.response.get("error") != "ratelimited": raise
+                retry_after = int(e.response.headers.get("Retry-After", 1))
+                logger.warning(f"Slack rate limited {name}; retrying in {retry_after}s.")
+                await asyncio.sleep(retry_after); await self._bucket(key).acquire()
+                return await attr(*args, **kwargs)
+        return call
+
+_slack_buckets = {}  # method name (or (chat_postMessage, channel)) -> TokenBucket, shared by every wrapper
+
 # --- SLACK APP (Socket Mode) ---
 slack_app = AsyncApp(
     token=os.environ.get("SLACK_BOT_TOKEN"),
     signing_secret=os.environ.get("SLACK_SIGNING_SECRET")
 )
-scheduler = AsyncIOScheduler()
+# Shared by background jobs; listeners get the same wrapper via the middleware below.
+slack_client = RateLimitedClient(slack_app.client, _slack_buckets)
+
+@slack_app.middleware
+async def rate_limit_slack_client(context, next):
+    context["client"] = RateLimitedClient(context.client, _slack_buckets)
+    await next()
 
 # --- DB & HELPER FUNCTIONS ---
-def db_write(q, p=()): conn = sqlite3.connect('slack_bot.db'); c=conn.cursor(); c.execute(q, p); conn.commit(); conn.close()
-def db_read_one(q, p=()): conn = sqlite3.connect('slack_bot.db'); c=conn.cursor(); c.execute(q, p); return c.fetchone()
-def db_read_all(q, p=()): conn = sqlite3.connect('slack_bot.db'); c=conn.cursor(); c.execute(q, p); return c.fetchall()
-def db_reset(): conn = sqlite3.connect('slack_bot.db'); c=conn.cursor(); c.execute("DELETE FROM birthdays"); c.execute("DELETE FROM anniversaries"); c.execute("DELETE FROM settings_birthday"); c.execute("DELETE FROM settings_anniversary"); c.execute("DELETE FROM settings_game"); conn.commit(); conn.close()
+# Blocking sqlite3 work runs in a worker thread so the event loop stays free.
+def _sync_write(q, p):
+    with _db_lock: DB.execute(q, p)
+def _sync_read_one(q, p):
+    with _db_read_lock: return DB_READ.execute(q, p).fetchone()
+def _sync_read_all(q, p):
+    with _db_read_lock: return DB_READ.execute(q, p).fetchall()
+def _sync_reset():
+    with _db_lock:
+        try: DB.executescript("BEGIN; DELETE FROM birthdays; DELETE FROM anniversaries; DELETE FROM settings; INSERT INTO settings (id) VALUES (1); COMMIT;")
+        except Exception:
+            if DB.in_transaction: DB.execute("ROLLBACK")
+            raise
+
+async def db_write(q, p=()): await asyncio.to_thread(_sync_write, q, p)
+async def db_read_one(q, p=()): return await asyncio.to_thread(_sync_read_one, q, p)
+async def db_read_all(q, p=()): return await asyncio.to_thread(_sync_read_all, q, p)
+async def db_reset():
+    global _SETTINGS_CACHE
+    await asyncio.to_thread(_sync_reset); _SETTINGS_CACHE = None
+
+SETTINGS_COLUMNS = ('bday_channel', 'bday_time', 'anniv_channel', 'anniv_time', 'game_enabled')
+_SETTINGS_CACHE = None  # the settings row, kept in step by update_settings() and db_reset()
+async def get_settings():
+    """Returns the single settings row as a dict keyed by column name (served from memory after the first read)."""
+    global _SETTINGS_CACHE
+    if _SETTINGS_CACHE is None:
+        row = await db_read_one(f"SELECT {', '.join(SETTINGS_COLUMNS)} FROM settings WHERE id = 1")
+        settings = dict(zip(SETTINGS_COLUMNS, row)) if row else dict.fromkeys(SETTINGS_COLUMNS)
+        settings['game_enabled'] = settings['game_enabled'] or 0
+        _SETTINGS_CACHE = settings
+    return dict(_SETTINGS_CACHE)
+async def update_settings(**values):
+    """Writes the given settings columns and updates the in-memory copy."""
+    await db_write(f"UPDATE settings SET {', '.join(f'{col} = ?' for col in values)} WHERE id = 1", tuple(values.values()))
+    if _SETTINGS_CACHE is not None: _SETTINGS_CACHE.update(values)
+
+# Slack user objects rarely change, so users_info results are reused for a while.
+USER_CACHE_TTL = 600
+_USER_CACHE = {}  # user_id -> (fetched_at, user dict)
+
+_USER_FETCHES = {}  # user_id -> in-flight users_info task, shared by concurrent callers
 
-async def is_user_admin(client, user_id):
-    try: user_info = await client.users_info(user=user_id); return user_info['user'].get('is_admin', False) or user_info['user'].get('is_owner', False)
-    except SlackApiError: return False
 async def get_user_info(client, user_id):
-    try: return await client.users_info(user=user_id)
+    """Returns the Slack `user` object for user_id (cached), or None if it can't be fetched."""
+    cached = _USER_CACHE.get(user_id)
+    if cached and time.monotonic() - cached[0] < USER_CACHE_TTL: return cached[1]
+    task = _USER_FETCHES.get(user_id)
+    if task is None:
+        task = _USER_FETCHES[user_id] = asyncio.create_task(_fetch_user_info(client, user_id))
+        task.add_done_callback(lambda _: _USER_FETCHES.pop(user_id, None))
+    return await asyncio.shield(task)
+
+async def _fetch_user_info(client, user_id):
+    try: response = await client.users_info(user=user_id)
     except SlackApiError: return None
+    user = response['user']; _USER_CACHE[user_id] = (time.monotonic(), user)
+    return user
+ADMIN_CACHE_TTL = 300
+_ADMIN_CACHE = {}  # user_id -> (checked_at, is_admin)
+# Optional comma-separated BOT_ADMINS env var; listed users skip the Slack lookup entirely.
+ADMIN_ALLOWLIST = frozenset(u.strip() for u in os.environ.get("BOT_ADMINS", "").split(",") if u.strip())
+
+async def is_user_admin(client, user_id):
+    if user_id in ADMIN_ALLOWLIST: return True
+    cached = _ADMIN_CACHE.get(user_id)
+    if cached and time.monotonic() - cached[0] < ADMIN_CACHE_TTL: return cached[1]
+    user = await get_user_info(client, user_id)
+    if not user: return False
+    is_admin = bool(user.get('is_admin', False) or user.get('is_owner', False))
+    _ADMIN_CACHE[user_id] = (time.monotonic(), is_admin)
+    return is_admin
+# Admin IDs for notifications. A background loop rebuilds the set from users.list every ADMIN_REFRESH_INTERVAL
+# seconds, and user_change/team_join events keep it in step between refreshes.
+ADMIN_REFRESH_INTERVAL = 600
+_ADMIN_IDS = (0.0, None)  # (built_at, set of user_ids)
+
+def _cache_user(user):
+    """Stores a full Slack user object (from users.list or an event) in the user and admin caches."""
+    now = time.monotonic()
+    is_admin = bool(user.get('is_admin', False) or user.get('is_owner', False))
+    _USER_CACHE[user['id']] = (now, user)
+    _ADMIN_CACHE[user['id']] = (now, is_admin)
+    cached_format = _DATE_FORMAT_CACHE.get(user['id'])
+    if cached_format and cached_format[1] != user.get('tz', ''): del _DATE_FORMAT_CACHE[user['id']]
+    admin_ids = _ADMIN_IDS[1]  # keep the notification set in step with user_change/team_join events
+    if admin_ids is not None: (admin_ids.add if is_admin and not user.get('is_bot') and not user.get('deleted') else admin_ids.discard)(user['id'])
+async def iter_members(client, limit=200):
+    """Yields workspace members page by page, following users.list cursors until the last page."""
+    cursor = None
+    while True:
+        response = await client.users_list(limit=limit, cursor=cursor)
+        for user in response['members']: yield user
+        cursor = response.get('response_metadata', {}).get('next_cursor')
+        if not cursor: return
+async def refresh_admin_ids(client):
+    """Rebuilds the admin/owner ID set by paging through users.list, priming the user caches on the way."""
+    global _ADMIN_IDS
+    admin_ids = set()
+    async for user in iter_members(client):
+        if user.get('is_bot'): continue
+        _cache_user(user)
+        if _ADMIN_CACHE[user['id']][1] and not user.get('deleted'): admin_ids.add(user['id'])
+    _ADMIN_IDS = (time.monotonic(), admin_ids)
+    return admin_ids
+async def get_admin_ids(client):
+    """Returns the cached admin/owner ID set; only rebuilds inline if the refresh job hasn't run recently."""
+    if _ADMIN_IDS[1] is not None and time.monotonic() - _ADMIN_IDS[0] < 2 * ADMIN_REFRESH_INTERVAL: return _ADMIN_IDS[1]
+    return await refresh_admin_ids(client)
+async def _admin_refresh_loop():
+    while True:
+        try: await refresh_admin_ids(slack_client)
+        except Exception as e: logger.error(f"Error refreshing admin cache: {e}")
+        await asyncio.sleep(ADMIN_REFRESH_INTERVAL)
+# Bounds concurrent DM fan-out (birthday collection, admin reminders) to the conversations.open burst.
+DM_CONCURRENCY = SLACK_METHOD_RATES['conversations_open'][1]
+_dm_sem = asyncio.Semaphore(DM_CONCURRENCY)
+# Cold-cache users_info fan-out (e.g. the delete modal) runs as wide as the users_info bucket's burst.
+LOOKUP_CONCURRENCY = SLACK_METHOD_RATES['users_info'][1]
+_lookup_sem = asyncio.Semaphore(LOOKUP_CONCURRENCY)
+async def notify_admins(client, text):
+    async def _notify(admin_id):
+        async with _dm_sem:
+            try: await client.chat_postMessage(channel=admin_id, text=text)
+            except Exception as e: logger.error(f"Failed to send admin reminder to {admin_id}: {e}")
+    await asyncio.gather(*(_notify(admin_id) for admin_id in await get_admin_ids(client)))
+
+# Slow work (LLM calls, DM fan-out) runs after ack() so Slack never has to retry the request.
+_background_tasks = set()
+def run_in_background(coro, label):
+    task = asyncio.create_task(coro); _background_tasks.add(task)
+    def _done(t):
+        _background_tasks.discard(t)
+        if not t.cancelled() and t.exception(): logger.error(f"Error in background task {label}: {t.exception()}")
+    task.add_done_callback(_done)
+    return task
+
+# The date format only depends on the user's timezone, so it outlives the user cache; _cache_user() drops it
+# when a fresh user object (user_change, team_join, users.list) carries a different timezone.
+DATE_FORMAT_CACHE_TTL = 3600
+_DATE_FORMAT_CACHE = {}  # user_id -> (checked_at, tz, (format_str, example_str))
+
 async def get_user_date_format(client, user_id):
-    user_info = await get_user_info(client, user_id)
-    if user_info and user_info.get('ok') and user_info.get('user', {}).get('tz', '').lower().startswith('america'): return ('MM-DD', 'e.g., 08-27')
-    return ('DD-MM', 'e.g., 27-08')
-async def get_channel_name(client, channel_id):
-    try: info = await client.conversations_info(channel=channel_id); return info['channel']['name']
-    except Exception: return channel_id
+    cached = _DATE_FORMAT_CACHE.get(user_id)
+    if cached and time.monotonic() - cached[0] < DATE_FORMAT_CACHE_TTL: return cached[2]
+    user = await get_user_info(client, user_id)
+    if not user: return ('DD-MM', 'e.g., 27-08')
+    tz = user.get('tz', '')
+    fmt = ('MM-DD', 'e.g., 08-27') if tz.lower().startswith('america') else ('DD-MM', 'e.g., 27-08')
+    _DATE_FORMAT_CACHE[user_id] = (time.monotonic(), tz, fmt)
+    return fmt
+
+# Stored dates use fixed layouts ('MM-DD' birthdays, 'YYYY-MM-DD' anniversaries), so they are sliced or
+# parsed with date.fromisoformat instead of going through strptime.
+MONTH_NAMES = ("", "January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December")
+def completed_years(today, d):
+    """Whole years elapsed from d to today (what relativedelta(today, d).years gave us)."""
+    return today.year - d.year - ((today.month, today.day) < (d.month, d.day))
+def format_month_day(d): return f"{MONTH_NAMES[d.month]} {d.day:02d}"  # same as strftime('%B %d')
+_BDAY_RE = re.compile(r"\d{2}-\d{2}")
+MMDD_INPUT_FORMAT, DDMM_INPUT_FORMAT = "%m-%d-%Y", "%d-%m-%Y"  # admin modal input gets '-2000' appended before parsing
+
+# The list views come back from SQLite already in "upcoming" order: month-days from today onward first,
+# then the ones that wrap into next year. Bind today's 'MM-DD' as the parameter.
+UPCOMING_BIRTHDAYS_SQL = "SELECT user_id, birthday_date FROM birthdays ORDER BY birthday_date < ?, birthday_date"
+UPCOMING_ANNIVERSARIES_SQL = "SELECT user_id, anniversary_date FROM anniversaries ORDER BY SUBSTR(anniversary_date, 6) < ?, SUBSTR(anniversary_date, 6)"
+def today_mmdd(): return date.today().strftime("%m-%d")
+
+def upcoming_anniversary_lines(anniversaries):
+    """Formats already-ordered (user_id, 'YYYY-MM-DD') rows of people here at least a year, in one pass."""
+    today = date.today()
+    lines = []
+    for user_id, s in anniversaries:
+        anniv_date = date.fromisoformat(s); years = completed_years(today, anniv_date)
+        if years >= 1: lines.append(f"• <@{user_id}> - {format_month_day(anniv_date)} {anniv_date.year} ({years}-year anniversary)")
+    return lines
 
 # ---------------------------------------------------------------------
 # --- GAME FRAMEWORK & IMPLEMENTATIONS (unchanged) ---
 # ---------------------------------------------------------------------
+def _end_game(user_id):
+    """Drops the user's finished game; safe to call if it is already gone."""
+    active_games.pop(user_id, None)
+
 async def start_wordle_game(user_id, client):
     word_of_the_day = await get_word_of_the_day()
-    game_state = {'game_name': 'wordle', 'state': {'word': word_of_the_day, 'guesses': []}}
+    game_state = {'game_name': 'wordle', 'state': {'word': word_of_the_day, 'guesses': [], 'rows': []}}
     active_games[user_id] = game_state
     logger.info(f"Starting Wordle game for {user_id}. Word is {word_of_the_day}.")
     initial_message = ("Happy Birthday! :tada: For a bit of fun, let's play a game of *Wordle*!\n\n"
@@ -125,20 +422,20 @@ async def handle_wordle_guess(guess, user_id, game_session, say):
         await say("That's not a 5-letter word. Please try again.")
         return
     if guess not in VALID_GUESSES:
-        is_real = await is_real_word_with_ai(guess)
-        if not is_real:
-            await say("That word is not in my dictionary. Please try again.")
-            return
+        await say("That word is not in my dictionary. Please try again.")
+        return
     game_state = game_session['state']
     target_word = game_state["word"]
     game_state["guesses"].append(guess)
-    history_text = "".join(f"`{g}` -> {evaluate_guess(g, target_word)}\n" for g in game_state["guesses"])
+    # Each guess is scored once; earlier rows are reused for the history.
+    game_state["rows"].append(f"`{guess}` -> {evaluate_guess(guess, target_word)}\n")
+    history_text = "".join(game_state["rows"])
     if guess == target_word:
         await say(f"{history_text}\nCongratulations, you guessed it! The word was *{target_word}*! :tada:")
-        del active_games[user_id]
+        _end_game(user_id)
     elif len(game_state["guesses"]) >= 6:
         await say(f"{history_text}\nNice try! You've used all your guesses. The word was *{target_word}*. Better luck next time!")
-        del active_games[user_id]
+        _end_game(user_id)
     else:
         remaining = 6 - len(game_state["guesses"])
         await say(f"{history_text}\nYou have {remaining} guess(es) left.")
@@ -164,31 +461,47 @@ async def handle_number_guesser_guess(guess_text, user_id, game_session, say):
     target = game_state['target']
     if guess == target:
         await say(f"You got it! The number was *{target}*. You guessed it in {game_state['guesses']} tries! :confetti_ball:")
-        del active_games[user_id]
+        _end_game(user_id)
     elif game_state['guesses'] >= game_state['limit']:
         await say(f"Nice try! You're out of guesses. The number I was thinking of was *{target}*. Better luck next time!")
-        del active_games[user_id]
+        _end_game(user_id)
     elif guess < target:
         await say(f"*{guess}* is too low. Guess *higher*! You have {game_state['limit'] - game_state['guesses']} tries left.")
     elif guess > target:
         await say(f"*{guess}* is too high. Guess *lower*! You have {game_state['limit'] - game_state['guesses']} tries left.")
 
+# Questions are fetched from OpenTDB in batches and served from memory.
+TRIVIA_QUESTIONS_PER_GAME = 5
+TRIVIA_BATCH_SIZE = 50
+TRIVIA_POOL = deque()
+_unescape = html.unescape
+_trivia_refill_lock = asyncio.Lock()
+
+async def _refill_trivia():
+    async with _trivia_refill_lock:
+        if len(TRIVIA_POOL) >= TRIVIA_QUESTIONS_PER_GAME: return  # another game already refilled
+        async with HTTP.get("https://opentdb.com/api.php", params={"amount": TRIVIA_BATCH_SIZE, "type": "multiple"}) as resp:
+            resp.raise_for_status()
+            TRIVIA_POOL.extend(orjson.loads(await resp.read()).get("results", []))
+
 async def start_trivia_game(user_id, client):
     try:
-        resp = requests.get("https://opentdb.com/api.php?amount=5&type=multiple", timeout=10)
-        resp.raise_for_status()
-        items = resp.json().get("results", [])
-        if not items:
+        if len(TRIVIA_POOL) < TRIVIA_QUESTIONS_PER_GAME:
+            await _refill_trivia()
+        if len(TRIVIA_POOL) < TRIVIA_QUESTIONS_PER_GAME:
             raise RuntimeError("No questions returned")
+        items = [TRIVIA_POOL.popleft() for _ in range(TRIVIA_QUESTIONS_PER_GAME)]
 
         questions = []
         for item in items:
-            q = html.unescape(item["question"])
-            correct = html.unescape(item["correct_answer"])
-            wrongs = [html.unescape(x) for x in item["incorrect_answers"]]
-            options = wrongs + [correct]
+            q = _unescape(item["question"])
+            correct = _unescape(item["correct_answer"])
+            options = list(map(_unescape, item["incorrect_answers"]))
+            # Shuffle the wrong answers, then drop the correct one into a random slot; same uniform
+            # ordering as shuffling all four, and the index is known without an options.index() scan.
             random.shuffle(options)
-            correct_index = options.index(correct)
+            correct_index = random.randrange(len(options) + 1)
+            options.insert(correct_index, correct)
             questions.append({
                 "category": item.get("category"),
                 "question": q,
@@ -210,35 +523,27 @@ async def start_trivia_game(user_id, client):
         await client.chat_postMessage(channel=user_id, text="Couldn't start trivia right now.")
 
 async def _send_trivia_q(user_id, client, qobj, qnum):
-    letters = ["A", "B", "C", "D"]
-    opts = "\n".join([f"{letters[i]}. {qobj['options'][i]}" for i in range(4)])
+    opts = "\n".join(f"{'ABCD'[i]}. {opt}" for i, opt in enumerate(qobj['options']))
     cat = f"_{qobj['category']}_" if qobj.get("category") else ""
     await client.chat_postMessage(
         channel=user_id,
-        text=(f"*Trivia Q{qnum}/5*\n{cat}\n*{qobj['question']}*\n\n{opts}\n\n"
+        text=(f"*Trivia Q{qnum}/{TRIVIA_QUESTIONS_PER_GAME}*\n{cat}\n*{qobj['question']}*\n\n{opts}\n\n"
               "Reply with A, B, C, or D.")
     )
 
+_LETTER_MAP = {"A": 0, "B": 1, "C": 2, "D": 3, "1": 0, "2": 1, "3": 2, "4": 3}
+
 def _parse_trivia_guess(text):
     t = text.strip().upper()
-    if t in ("A", "B", "C", "D"):
-        return "letter", "ABCD".index(t)
-    if t in ("1", "2", "3", "4"):
-        return "index", int(t) - 1
-    return "text", t
+    idx = _LETTER_MAP.get(t)
+    return ("letter", idx) if idx is not None else ("text", t)
 
 async def handle_trivia_guess(guess, user_id, game_session, say):
     state = game_session["state"]
     q = state["questions"][state["idx"]]
     mode, val = _parse_trivia_guess(guess)
-    chosen_index = None
-    if mode in ("letter", "index"):
-        chosen_index = val
-    else:
-        for i, opt in enumerate(q["options"]):
-            if opt.strip().upper() == val:
-                chosen_index = i
-                break
+    if mode == "letter": chosen_index = val
+    else: chosen_index = next((i for i, opt in enumerate(q["options"]) if opt.strip().upper() == val), None)
 
     if chosen_index is None or not (0 <= chosen_index < 4):
         await say("Answer with A, B, C, or D.")
@@ -248,28 +553,24 @@ async def handle_trivia_guess(guess, user_id, game_session, say):
         state["score"] += 1
         await say("✅ Correct!")
     else:
-        letters = ["A", "B", "C", "D"]
-        await say(f"❌ The correct answer was *{letters[q['correct_index']]}. {q['options'][q['correct_index']]}*.")
+        await say(f"❌ The correct answer was *{'ABCD'[q['correct_index']]}. {q['options'][q['correct_index']]}*.")
 
     state["idx"] += 1
-    if state["idx"] >= 5:
-        await say(f"🎉 Trivia complete! You scored *{state['score']}/5*.")
-        del active_games[user_id]
+    if state["idx"] >= TRIVIA_QUESTIONS_PER_GAME:
+        await say(f"🎉 Trivia complete! You scored *{state['score']}/{TRIVIA_QUESTIONS_PER_GAME}*.")
+        _end_game(user_id)
     else:
-        await _send_trivia_q(user_id, slack_app.client, state["questions"][state["idx"]], state["idx"] + 1)
+        await _send_trivia_q(user_id, slack_client, state["questions"][state["idx"]], state["idx"] + 1)
 
 
 def _render_hangman_board(word, guessed_letters):
-    display = ""
-    for letter in word:
-        display += (f"{letter} " if letter in guessed_letters else "_ ")
-    return f"`{display.strip()}`"
+    return "`" + " ".join(letter if letter in guessed_letters else "_" for letter in word) + "`"
 
 async def start_hangman_game(user_id, client):
     target_word = await get_hangman_word()
     game_state = {
         'game_name': 'hangman',
-        'state': {'target': target_word, 'guessed_letters': set(), 'lives': 6}
+        'state': {'target': target_word, 'target_letters': frozenset(target_word), 'guessed_letters': set(), 'lives': 6}
     }
     active_games[user_id] = game_state
     logger.info(f"Starting Hangman game for {user_id}. Word is {target_word}.")
@@ -285,30 +586,36 @@ async def start_hangman_game(user_id, client):
 
 
 async def handle_hangman_guess(guess, user_id, game_session, say):
+    # handle_dm has already stripped and upper-cased the reply; non-letter replies fall through to the prompt.
     game_state = game_session['state']
     target = game_state['target']
-    if len(guess) == len(target) and guess == target:
-        await say(f"You got it! The word was *{target}*. You win! :trophy:")
-        del active_games[user_id]; return
-    if len(guess) != 1 or not guess.isalpha():
-        await say("Please guess a single letter or the full word."); return
-    if guess in game_state['guessed_letters']:
-        await say(f"You already guessed '{guess}'. Try again!"); return
-    game_state['guessed_letters'].add(guess)
-    if guess not in target:
+    n = len(guess)
+    if n == len(target) and n > 1 and guess.isalpha():
+        if guess == target:
+            await say(f"You got it! The word was *{target}*. You win! :trophy:")
+            _end_game(user_id); return
         game_state['lives'] -= 1
-        feedback = f"Sorry, no '{guess}'. You have *{game_state['lives']}* lives left."
+        feedback = f"Sorry, the word isn't '{guess}'. You have *{game_state['lives']}* lives left."
+    elif n == 1 and guess.isalpha():
+        if guess in game_state['guessed_letters']:
+            await say(f"You already guessed '{guess}'. Try again!"); return
+        game_state['guessed_letters'].add(guess)
+        if guess not in target:
+            game_state['lives'] -= 1
+            feedback = f"Sorry, no '{guess}'. You have *{game_state['lives']}* lives left."
+        else:
+            feedback = f"Good guess! '{guess}' is in the word."
     else:
-        feedback = f"Good guess! '{guess}' is in the word."
+        await say("Please guess a single letter or the full word."); return
     board = _render_hangman_board(target, game_state['guessed_letters'])
-    if all(letter in game_state['guessed_letters'] for letter in target):
+    if game_state['target_letters'] <= game_state['guessed_letters']:
         await say(f"{board}\n\n{feedback}\n\nYou figured it out! The word was *{target}*. You win! :trophy:")
-        del active_games[user_id]; return
+        _end_game(user_id); return
     if game_state['lives'] <= 0:
         await say(f"{board}\n\n{feedback}\n\nOh no, you're out of lives! The word was *{target}*. Better luck next time!")
-        del active_games[user_id]; return
-    guessed_list = ", ".join(sorted(list(game_state['guessed_letters'])))
-    await say(f"{board}\n\n{feedback}\n\n*Guessed letters:* {guessed_list}")
+        _end_game(user_id); return
+    guessed_list = ", ".join(sorted(game_state['guessed_letters']))
+    await say(f"{board}\n\n{feedback}" + (f"\n\n*Guessed letters:* {guessed_list}" if guessed_list else ""))  # a word guess can come first
 
 # --- Central Game Registry ---
 GAME_REGISTRY = {
@@ -317,13 +624,14 @@ GAME_REGISTRY = {
     "trivia": {"name": "Trivia", "start": start_trivia_game, "handler": handle_trivia_guess},
     "hangman": {"name": "Hangman", "start": start_hangman_game, "handler": handle_hangman_guess},
 }
+_GAME_KEYS = tuple(GAME_REGISTRY)  # the registry is static, so the random pick draws from this
 
 
 
 def _pick_local_hangman_word(target_len: int):
     """Pick a local word of exactly target_len if possible."""
-    # Prefer HANGMAN_WORDS filtered by length (includes optional hangman_words.txt)
-    pool = [w for w in HANGMAN_WORDS if len(w) == target_len]
+    # Prefer HANGMAN_WORDS of that length (includes optional hangman_words.txt)
+    pool = _HANGMAN_BY_LEN.get(target_len)
     if pool:
         return random.choice(pool)
     # Last resort: 5-letter Wordle answers only if target_len == 5
@@ -339,6 +647,7 @@ async def get_hangman_word():
     target_len = random.randint(5, 8)
 
     # --- Gemini first ---
+    gemini_model = get_gemini_model()
     if gemini_model:
         try:
             logger.info(f"Gemini: choosing a {target_len}-letter Hangman word...")
@@ -347,7 +656,7 @@ async def get_hangman_word():
                 "Letters A–Z only (no hyphens, apostrophes, or spaces). "
                 "Reply with ONLY the word."
             )
-            resp = await gemini_model.generate_content_async(prompt)
+            resp = await gemini_generate(gemini_model, prompt)
             ai_word = resp.text.strip().upper()
             if ai_word.isalpha() and len(ai_word) == target_len:
                 return ai_word
@@ -361,22 +670,37 @@ async def get_hangman_word():
         return local
 
     # --- Broaden: any 5–8 length from our sets ---
-    broad_pool = [w for w in HANGMAN_WORDS if 5 <= len(w) <= 8]
+    broad_pool = _HANGMAN_POOL
     if not broad_pool:
         # absolute last resort: any word we have
-        broad_pool = list(VALID_GUESSES) or WORDLE_ANSWERS
-    return random.choice(list(broad_pool)).upper()
+        broad_pool = tuple(VALID_GUESSES) or WORDLE_ANSWERS
+    return random.choice(broad_pool).upper()
 
 
 # --- WORDLE HELPERS & GUI BUILDERS ---
+_word_of_the_day = (None, None)  # (date ordinal, word)
+_word_of_the_day_lock = asyncio.Lock()  # concurrent birthday games wait for one Gemini pick instead of each asking
+
 async def get_word_of_the_day():
+    """Returns today's Wordle answer, choosing it at most once per day."""
+    global _word_of_the_day
+    today = date.today().toordinal()
+    if _word_of_the_day[0] == today: return _word_of_the_day[1]
+    async with _word_of_the_day_lock:
+        if _word_of_the_day[0] != today:
+            _word_of_the_day = (today, await _choose_word_of_the_day())
+    return _word_of_the_day[1]
+
+async def _choose_word_of_the_day():
+    gemini_model = get_gemini_model()
     if not gemini_model:
         logger.warning("AI not configured. Using local fallback for Wordle answer.")
         return get_fallback_word()
     try:
         logger.info("Attempting to get Wordle answer from AI...")
-        prompt = "choose a single, common, 5-letter English word suitable for a word game. Respond with only the single word and nothing else. word list: " + "\n".join(VALID_GUESSES)
-        response = await gemini_model.generate_content_async(prompt)
+        # The answer is validated against VALID_GUESSES locally, so the prompt doesn't ship the dictionary.
+        prompt = "choose a single, common, 5-letter English word suitable for a word game. Respond with only the single word and nothing else."
+        response = await gemini_generate(gemini_model, prompt)
         ai_word = response.text.strip().upper()
         if len(ai_word) == 5 and ai_word.isalpha() and ai_word in VALID_GUESSES:
             logger.info(f"AI chose a valid word of the day: {ai_word}")
@@ -389,32 +713,45 @@ async def get_word_of_the_day():
         return get_fallback_word()
 
 def get_fallback_word():
-    random.seed(date.today().toordinal())
-    return random.choice(WORDLE_ANSWERS)
+    # A private, date-seeded generator keeps the pick stable for the day without reseeding the global RNG.
+    return random.Random(date.today().toordinal()).choice(WORDLE_ANSWERS)
 
 def evaluate_guess(guess, target):
-    results = [""] * 5; target_list = list(target); guess_list = list(guess)
+    # Pass 1 marks greens and counts the unmatched target letters; pass 2 spends those counts on yellows.
+    results = ["⬛"] * 5; remaining = [0] * 26
     for i in range(5):
-        if guess_list[i] == target_list[i]: results[i] = "🟩"; target_list[i] = None; guess_list[i] = None
+        if guess[i] == target[i]: results[i] = "🟩"
+        else: remaining[ord(target[i]) - 65] += 1
     for i in range(5):
-        if guess_list[i] is not None:
-            if guess_list[i] in target_list: results[i] = "🟨"; target_list[target_list.index(guess_list[i])] = None
-            else: results[i] = "⬛"
+        if results[i] != "🟩":
+            slot = ord(guess[i]) - 65
+            if remaining[slot] > 0: results[i] = "🟨"; remaining[slot] -= 1
     return "".join(results)
 
+_valid_guesses_log = None  # append handle for valid_guesses.txt, opened on first use and kept for the bot's lifetime
+
+def _append_valid_guess(word):
+    global _valid_guesses_log
+    if _valid_guesses_log is None:
+        _valid_guesses_log = open("valid_guesses.txt", "a"); atexit.register(_valid_guesses_log.close)
+    _valid_guesses_log.write(f"\n{word.lower()}"); _valid_guesses_log.flush()
+
 async def is_real_word_with_ai(word):
+    """Asks Gemini whether `word` is real; if so it is saved to valid_guesses.txt. Used by /add-word."""
+    global VALID_GUESSES
+    gemini_model = get_gemini_model()
     if not gemini_model:
         logger.warning("AI validation skipped: Gemini model not configured.")
         return False
     try:
         logger.info(f"Performing AI validation for word: {word}")
         prompt = f"Is '{word}' a real, common, this is the most important please give a 5-letter English word? Do not include proper nouns. Answer with only the single word 'yes' or 'no'."
-        response = await gemini_model.generate_content_async(prompt)
+        response = await gemini_generate(gemini_model, prompt)
         is_valid = response.text.strip().lower() == 'yes'
         if is_valid:
             logger.info(f"AI validation successful for '{word}'. Adding to dictionary.")
-            with open("valid_guesses.txt", "a") as f: f.write(f"\n{word.lower()}")
-            VALID_GUESSES.add(word)
+            await asyncio.to_thread(_append_valid_guess, word)
+            VALID_GUESSES = VALID_GUESSES | {sys.intern(word)}
         else:
             logger.info(f"AI validation rejected the word: {word}")
         return is_valid
@@ -422,11 +759,23 @@ async def is_real_word_with_ai(word):
         logger.error(f"Error during AI word validation for '{word}': {e}")
         return False
 
+# Generated messages are reused for the rest of the day, so repeated /test-*-ai runs cost no Gemini call.
+MESSAGE_CACHE_SIZE = 256
+_MESSAGE_CACHE = {}  # (kind, user_id, years, iso date) -> generated text
+
+def _remember_message(key, text):
+    if len(_MESSAGE_CACHE) >= MESSAGE_CACHE_SIZE: _MESSAGE_CACHE.pop(next(iter(_MESSAGE_CACHE)))
+    _MESSAGE_CACHE[key] = text
+    return text
+
 async def generate_birthday_message(user_id):
-    user_info = await get_user_info(slack_app.client, user_id)
-    user_name = user_info['user']['profile'].get('real_name', 'our teammate') if user_info else 'our teammate'
+    cache_key = ('birthday', user_id, None, date.today().isoformat())
+    if cache_key in _MESSAGE_CACHE: return _MESSAGE_CACHE[cache_key]
+    user_info = await get_user_info(slack_client, user_id)
+    user_name = user_info['profile'].get('real_name', 'our teammate') if user_info else 'our teammate'
     # FIX APPLIED: Correct fallback message syntax
     fallback_message = f"<!channel> Happy Birthday <@{user_id}>! :tada:"
+    gemini_model = get_gemini_model()
     if not gemini_model:
         logger.warning("Gemini model failed. Using fallback message.")
         return fallback_message
@@ -440,18 +789,21 @@ async def generate_birthday_message(user_id):
                   f"The message should be posted in a company Slack channel. "
                   f"It must include emojis. It must end by encouraging everyone to wish them a happy birthday. "
                   f"Make it exciting and celebratory. Do not use hashtags.")
-        response = await gemini_model.generate_content_async(prompt)
+        response = await gemini_generate(gemini_model, prompt)
         logger.info("Gemini message generated successfully.")
-        return response.text
+        return _remember_message(cache_key, response.text)
     except Exception as e:
         logger.critical(f"CRITICAL ERROR during Gemini generation: {e}")
         return fallback_message
 
 async def generate_anniversary_message(user_id, years):
-    user_info = await get_user_info(slack_app.client, user_id)
-    user_name = user_info['user']['profile'].get('real_name', 'our teammate') if user_info else 'our teammate'
+    cache_key = ('anniversary', user_id, years, date.today().isoformat())
+    if cache_key in _MESSAGE_CACHE: return _MESSAGE_CACHE[cache_key]
+    user_info = await get_user_info(slack_client, user_id)
+    user_name = user_info['profile'].get('real_name', 'our teammate') if user_info else 'our teammate'
     # FIX APPLIED: Correct fallback message syntax
     fallback_message = f"<!channel> Happy {years}-year anniversary, <@{user_id}>! :tada:"
+    gemini_model = get_gemini_model()
     if not gemini_model:
         logger.warning("Gemini model failed. Using fallback message.")
         return fallback_message
@@ -465,135 +817,151 @@ async def generate_anniversary_message(user_id, years):
                   f"Add a line break after the first sentence."
                   f"Post it in a company Slack channel. It should include a few emojis. "
                   f"End by encouraging everyone to congratulate them. Make it sound appreciative. Do not use hashtags.")
-        response = await gemini_model.generate_content_async(prompt)
+        response = await gemini_generate(gemini_model, prompt)
         logger.info("Gemini message generated successfully.")
-        return response.text
+        return _remember_message(cache_key, response.text)
     except Exception as e:
         logger.critical(f"CRITICAL ERROR during Gemini generation: {e}")
         return fallback_message
 
-def build_settings_modal(callback_id, title, current_settings=None):
-    channel = current_settings[1] if current_settings else None; time = current_settings[2] if current_settings else "09:00"
+def build_settings_modal(callback_id, title, channel=None, time=None):
+    time = time or "09:00"
     channel_select_element = {"type": "channels_select", "placeholder": {"type": "plain_text", "text": "Select a channel"}, "action_id": "channel_select_action"}
     if channel: channel_select_element["initial_channel"] = channel
     return {"type": "modal", "callback_id": callback_id, "title": {"type": "plain_text", "text": title}, "submit": {"type": "plain_text", "text": "Save"}, "close": {"type": "plain_text", "text": "Cancel"}, "blocks": [{"type": "input", "block_id": "channel_block", "element": channel_select_element, "label": {"type": "plain_text", "text": "Where to post announcements?"}}, {"type": "input", "block_id": "time_block", "element": {"type": "timepicker", "initial_time": time, "action_id": "time_select_action"}, "label": {"type": "plain_text", "text": "What time should I post?"}}]}
 
-def build_reset_modal(): return {"type": "modal", "callback_id": "reset_confirmed", "title": {"type": "plain_text", "text": "Confirm Bot Reset"}, "submit": {"type": "plain_text", "text": "Yes, Reset Now"}, "close": {"type": "plain_text", "text": "Cancel"}, "blocks": [{"type": "section", "text": {"type": "mrkdwn", "text": "*:warning: DANGER: THIS CANNOT BE UNDONE. :warning:*"}}, {"type": "section", "text": {"type": "mrkdwn", "text": "This deletes *ALL* saved birthdays, anniversaries, and settings permanently."}}]}
+# Fixed views are built once at import and shared; views_open/views_publish only serialize them.
+_RESET_MODAL = {"type": "modal", "callback_id": "reset_confirmed", "title": {"type": "plain_text", "text": "Confirm Bot Reset"}, "submit": {"type": "plain_text", "text": "Yes, Reset Now"}, "close": {"type": "plain_text", "text": "Cancel"}, "blocks": [{"type": "section", "text": {"type": "mrkdwn", "text": "*:warning: DANGER: THIS CANNOT BE UNDONE. :warning:*"}}, {"type": "section", "text": {"type": "mrkdwn", "text": "This deletes *ALL* saved birthdays, anniversaries, and settings permanently."}}]}
+def build_reset_modal(): return _RESET_MODAL
 
-def build_admin_set_birthday_modal(): return {"type": "modal", "callback_id": "admin_set_birthday_submitted", "title": {"type": "plain_text", "text": "Admin: Set Birthday"}, "submit": {"type": "plain_text", "text": "Save Birthday"}, "close": {"type": "plain_text", "text": "Cancel"}, "blocks": [{"type": "input", "block_id": "user_select_block", "label": {"type": "plain_text", "text": "Select a user"}, "element": {"type": "users_select", "placeholder": {"type": "plain_text", "text": "Select a user..."}, "action_id": "user_select_action"}}, {"type": "input", "block_id": "format_select_block", "label": {"type": "plain_text", "text": "Date Format"}, "element": {"type": "radio_buttons", "action_id": "format_select_action", "options": [{"text": {"type": "plain_text", "text": "MM-DD (e.g., 04-22)"}, "value": "MM-DD"}, {"text": {"type": "plain_text", "text": "DD-MM (e.g., 22-04)"}, "value": "DD-MM"}]}}, {"type": "input", "block_id": "date_input_block", "label": {"type": "plain_text", "text": "Enter Date"}, "element": {"type": "plain_text_input", "placeholder": {"type": "plain_text", "text": "e.g., 04-22"}, "action_id": "date_input_action"}}]}
+_ADMIN_SET_BIRTHDAY_MODAL = {"type": "modal", "callback_id": "admin_set_birthday_submitted", "title": {"type": "plain_text", "text": "Admin: Set Birthday"}, "submit": {"type": "plain_text", "text": "Save Birthday"}, "close": {"type": "plain_text", "text": "Cancel"}, "blocks": [{"type": "input", "block_id": "user_select_block", "label": {"type": "plain_text", "text": "Select a user"}, "element": {"type": "users_select", "placeholder": {"type": "plain_text", "text": "Select a user..."}, "action_id": "user_select_action"}}, {"type": "input", "block_id": "format_select_block", "label": {"type": "plain_text", "text": "Date Format"}, "element": {"type": "radio_buttons", "action_id": "format_select_action", "options": [{"text": {"type": "plain_text", "text": "MM-DD (e.g., 04-22)"}, "value": "MM-DD"}, {"text": {"type": "plain_text", "text": "DD-MM (e.g., 22-04)"}, "value": "DD-MM"}]}}, {"type": "input", "block_id": "date_input_block", "label": {"type": "plain_text", "text": "Enter Date"}, "element": {"type": "plain_text_input", "placeholder": {"type": "plain_text", "text": "e.g., 04-22"}, "action_id": "date_input_action"}}]}
+def build_admin_set_birthday_modal(): return _ADMIN_SET_BIRTHDAY_MODAL
 
-def build_admin_set_anniversary_modal(): return {"type": "modal", "callback_id": "admin_set_anniversary_submitted", "title": {"type": "plain_text", "text": "Admin: Set Anniversary"}, "submit": {"type": "plain_text", "text": "Save Anniversary"}, "close": {"type": "plain_text", "text": "Cancel"}, "blocks": [{"type": "input", "block_id": "user_select_block", "label": {"type": "plain_text", "text": "Select a user"}, "element": {"type": "users_select", "placeholder": {"type": "plain_text", "text": "Select a user..."}, "action_id": "user_select_action"}}, {"type": "input", "block_id": "date_input_block", "label": {"type": "plain_text", "text": "Select their work start date"}, "element": {"type": "datepicker", "placeholder": {"type": "plain_text", "text": "Select a date"}, "action_id": "date_input_action"}}]}
+_ADMIN_SET_ANNIVERSARY_MODAL = {"type": "modal", "callback_id": "admin_set_anniversary_submitted", "title": {"type": "plain_text", "text": "Admin: Set Anniversary"}, "submit": {"type": "plain_text", "text": "Save Anniversary"}, "close": {"type": "plain_text", "text": "Cancel"}, "blocks": [{"type": "input", "block_id": "user_select_block", "label": {"type": "plain_text", "text": "Select a user"}, "element": {"type": "users_select", "placeholder": {"type": "plain_text", "text": "Select a user..."}, "action_id": "user_select_action"}}, {"type": "input", "block_id": "date_input_block", "label": {"type": "plain_text", "text": "Select their work start date"}, "element": {"type": "datepicker", "placeholder": {"type": "plain_text", "text": "Select a date"}, "action_id": "date_input_action"}}]}
+def build_admin_set_anniversary_modal(): return _ADMIN_SET_ANNIVERSARY_MODAL
 
-def build_delete_type_modal(): return {"type": "modal", "callback_id": "delete_type_selected", "title": {"type": "plain_text", "text": "Delete User Data"}, "submit": {"type": "plain_text", "text": "Next"}, "close": {"type": "plain_text", "text": "Cancel"}, "blocks": [{"type": "input", "block_id": "delete_type_block", "label": {"type": "plain_text", "text": "What do you want to delete?"}, "element": {"type": "radio_buttons", "action_id": "delete_type_action", "options": [{"text": {"type": "plain_text", "text": "A User's Birthday"}, "value": "birthday"}, {"text": {"type": "plain_text", "text": "A User's Anniversary"}, "value": "anniversary"}]}}]}
+_DELETE_TYPE_MODAL = {"type": "modal", "callback_id": "delete_type_selected", "title": {"type": "plain_text", "text": "Delete User Data"}, "submit": {"type": "plain_text", "text": "Next"}, "close": {"type": "plain_text", "text": "Cancel"}, "blocks": [{"type": "input", "block_id": "delete_type_block", "label": {"type": "plain_text", "text": "What do you want to delete?"}, "element": {"type": "radio_buttons", "action_id": "delete_type_action", "options": [{"text": {"type": "plain_text", "text": "A User's Birthday"}, "value": "birthday"}, {"text": {"type": "plain_text", "text": "A User's Anniversary"}, "value": "anniversary"}]}}]}
+def build_delete_type_modal(): return _DELETE_TYPE_MODAL
 
 async def build_delete_user_modal(delete_type, client):
     title = f"Delete {delete_type.capitalize()}"; table_name = f"{delete_type}s"
-    users_with_data = db_read_all(f"SELECT user_id FROM {table_name}")
+    users_with_data = await db_read_all(f"SELECT user_id FROM {table_name}")
     if not users_with_data: return None
-    user_options = []
-    for (user_id,) in users_with_data:
-        info = await get_user_info(client, user_id)
-        user_name = info['user']['real_name'] if (info and info['ok']) else user_id
-        user_options.append({"text": {"type": "plain_text", "text": user_name}, "value": user_id})
+    user_ids = [user_id for (user_id,) in users_with_data]
+    async def _lookup(user_id):
+        async with _lookup_sem: return await get_user_info(client, user_id)
+    infos = await asyncio.gather(*(_lookup(user_id) for user_id in user_ids))
+    user_options = [{"text": {"type": "plain_text", "text": info.get('real_name', user_id) if info else user_id}, "value": user_id} for user_id, info in zip(user_ids, infos)]
     return {"type": "modal", "callback_id": f"delete_{delete_type}_confirmed", "title": {"type": "plain_text", "text": title}, "submit": {"type": "plain_text", "text": "Delete Forever"}, "close": {"type": "plain_text", "text": "Cancel"}, "blocks": [{"type": "input", "block_id": "user_select_block", "label": {"type": "plain_text", "text": "Select user to delete"}, "element": {"type": "static_select", "placeholder": {"type": "plain_text", "text": "Select a user..."}, "action_id": "user_select_action", "options": user_options}}]}
 
+_GAME_STATUS_OPTIONS = [{"text": {"type": "plain_text", "text": "Enable Games"}, "value": "1"}, {"text": {"type": "plain_text", "text": "Disable Games"}, "value": "0"}]
 def build_game_settings_modal(current_status):
-    options = [{"text": {"type": "plain_text", "text": "Enable Games"}, "value": "1"}, {"text": {"type": "plain_text", "text": "Disable Games"}, "value": "0"}]
+    options = _GAME_STATUS_OPTIONS
     initial_option = next((opt for opt in options if opt["value"] == str(current_status)), None)
     blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": "Enable this feature to send a random game to users on their birthday."}}, {"type": "input", "block_id": "game_status_block", "label": {"type": "plain_text", "text": "Birthday Game Status"}, "element": {"type": "radio_buttons", "action_id": "game_status_action", "options": options, **({"initial_option": initial_option} if initial_option else {})}}]
     return {"type": "modal", "callback_id": "game_settings_submitted", "title": {"type": "plain_text", "text": "Game Settings"}, "submit": {"type": "plain_text", "text": "Save"}, "close": {"type": "plain_text", "text": "Cancel"}, "blocks": blocks}
 
-def build_test_game_modal():
-    game_options = [{"text": {"type": "plain_text", "text": game_details["name"]},"value": game_key} for game_key, game_details in GAME_REGISTRY.items()]
-    return {"type": "modal","callback_id": "test_game_selected","title": {"type": "plain_text","text": "Test a Game"},"submit": {"type": "plain_text","text": "Start Test"},"close": {"type": "plain_text","text": "Cancel"},"blocks": [{"type": "input","block_id": "game_select_block","label": {"type": "plain_text","text": "Which game would you like to test?"},"element": {"type": "static_select","placeholder": {"type": "plain_text","text": "Select a game"},"action_id": "game_select_action","options": game_options}}]}
+# GAME_REGISTRY is fixed at import, so the test-game modal is built once.
+_TEST_GAME_OPTIONS = [{"text": {"type": "plain_text", "text": game_details["name"]},"value": game_key} for game_key, game_details in GAME_REGISTRY.items()]
+_TEST_GAME_MODAL = {"type": "modal","callback_id": "test_game_selected","title": {"type": "plain_text","text": "Test a Game"},"submit": {"type": "plain_text","text": "Start Test"},"close": {"type": "plain_text","text": "Cancel"},"blocks": [{"type": "input","block_id": "game_select_block","label": {"type": "plain_text","text": "Which game would you like to test?"},"element": {"type": "static_select","placeholder": {"type": "plain_text","text": "Select a game"},"action_id": "game_select_action","options": _TEST_GAME_OPTIONS}}]}
+
+def build_test_game_modal(): return _TEST_GAME_MODAL
 
 # --- NEW: Admin Home Tab View Builder ---
+_ADMIN_HOME_VIEW = {
+    "type": "home",
+    "blocks": [
+        {"type": "header", "text": {"type": "plain_text", "text": ":robot_face: Admin Control Panel", "emoji": True}},
+        {"type": "section", "text": {"type": "mrkdwn", "text": "Welcome, Admin! Use these controls to manage the Celebration Bot."}},
+        {"type": "divider"},
+        {"type": "header", "text": {"type": "plain_text", "text": "⚙️ Main Settings", "emoji": True}},
+        {"type": "actions", "elements": [
+            {"type": "button", "text": {"type": "plain_text", "text": "Birthday Settings", "emoji": True}, "style": "primary", "action_id": "admin_home_setup_birthdays"},
+            {"type": "button", "text": {"type": "plain_text", "text": "Anniversary Settings", "emoji": True}, "style": "primary", "action_id": "admin_home_setup_anniversaries"},
+            {"type": "button", "text": {"type": "plain_text", "text": "Game Settings", "emoji": True}, "style": "primary", "action_id": "admin_home_setup_games"}
+        ]},
+        {"type": "divider"},
+        {"type": "header", "text": {"type": "plain_text", "text": "👥 User Data Management", "emoji": True}},
+        {"type": "actions", "elements": [
+            {"type": "button", "text": {"type": "plain_text", "text": "Set a Birthday", "emoji": True}, "action_id": "admin_home_set_birthday"},
+            {"type": "button", "text": {"type": "plain_text", "text": "Set an Anniversary", "emoji": True}, "action_id": "admin_home_set_anniversary"},
+        ]},
+        {"type": "divider"},
+        {"type": "header", "text": {"type": "plain_text", "text": "📊 View Data & Tests", "emoji": True}},
+        {"type": "actions", "elements": [
+            {"type": "button", "text": {"type": "plain_text", "text": "List Birthdays", "emoji": True}, "action_id": "admin_home_list_birthdays"},
+            {"type": "button", "text": {"type": "plain_text", "text": "List Anniversaries", "emoji": True}, "action_id": "admin_home_list_anniversaries"},
+            {"type": "button", "text": {"type": "plain_text", "text": "Test a Game", "emoji": True}, "action_id": "admin_home_test_game"}
+        ]},
+        {"type": "actions", "elements": [
+            {"type": "button", "text": {"type": "plain_text", "text": "Test Birthday Message", "emoji": True}, "action_id": "admin_home_test_bday_ai"},
+            {"type": "button", "text": {"type": "plain_text", "text": "Test Anniversary Message", "emoji": True}, "action_id": "admin_home_test_anniv_ai"}
+        ]},
+        {"type": "divider"},
+        {"type": "header", "text": {"type": "plain_text", "text": "🚨 Danger Zone", "emoji": True}},
+        {"type": "actions", "elements": [
+            {"type": "button", "text": {"type": "plain_text", "text": "Reset Entire Bot", "emoji": True}, "style": "danger", "action_id": "admin_home_reset_bot"},
+            {"type": "button", "text": {"type": "plain_text", "text": "Delete User Data", "emoji": True}, "style": "danger", "action_id": "admin_home_delete_data"}
+        ]}
+    ]
+}
+
 def build_admin_home_view():
     """Builds the rich Block Kit view for the admin control panel."""
-    return {
-        "type": "home",
-        "blocks": [
-            {"type": "header", "text": {"type": "plain_text", "text": ":robot_face: Admin Control Panel", "emoji": True}},
-            {"type": "section", "text": {"type": "mrkdwn", "text": "Welcome, Admin! Use these controls to manage the Celebration Bot."}},
-            {"type": "divider"},
-            {"type": "header", "text": {"type": "plain_text", "text": "⚙️ Main Settings", "emoji": True}},
-            {"type": "actions", "elements": [
-                {"type": "button", "text": {"type": "plain_text", "text": "Birthday Settings", "emoji": True}, "style": "primary", "action_id": "admin_home_setup_birthdays"},
-                {"type": "button", "text": {"type": "plain_text", "text": "Anniversary Settings", "emoji": True}, "style": "primary", "action_id": "admin_home_setup_anniversaries"},
-                {"type": "button", "text": {"type": "plain_text", "text": "Game Settings", "emoji": True}, "style": "primary", "action_id": "admin_home_setup_games"}
-            ]},
-            {"type": "divider"},
-            {"type": "header", "text": {"type": "plain_text", "text": "👥 User Data Management", "emoji": True}},
-            {"type": "actions", "elements": [
-                {"type": "button", "text": {"type": "plain_text", "text": "Set a Birthday", "emoji": True}, "action_id": "admin_home_set_birthday"},
-                {"type": "button", "text": {"type": "plain_text", "text": "Set an Anniversary", "emoji": True}, "action_id": "admin_home_set_anniversary"},
-            ]},
-            {"type": "divider"},
-            {"type": "header", "text": {"type": "plain_text", "text": "📊 View Data & Tests", "emoji": True}},
-            {"type": "actions", "elements": [
-                {"type": "button", "text": {"type": "plain_text", "text": "List Birthdays", "emoji": True}, "action_id": "admin_home_list_birthdays"},
-                {"type": "button", "text": {"type": "plain_text", "text": "List Anniversaries", "emoji": True}, "action_id": "admin_home_list_anniversaries"},
-                {"type": "button", "text": {"type": "plain_text", "text": "Test a Game", "emoji": True}, "action_id": "admin_home_test_game"}
-            ]},
-            {"type": "actions", "elements": [
-                {"type": "button", "text": {"type": "plain_text", "text": "Test Birthday Message", "emoji": True}, "action_id": "admin_home_test_bday_ai"},
-                {"type": "button", "text": {"type": "plain_text", "text": "Test Anniversary Message", "emoji": True}, "action_id": "admin_home_test_anniv_ai"}
-            ]},
-            {"type": "divider"},
-            {"type": "header", "text": {"type": "plain_text", "text": "🚨 Danger Zone", "emoji": True}},
-            {"type": "actions", "elements": [
-                {"type": "button", "text": {"type": "plain_text", "text": "Reset Entire Bot", "emoji": True}, "style": "danger", "action_id": "admin_home_reset_bot"},
-                {"type": "button", "text": {"type": "plain_text", "text": "Delete User Data", "emoji": True}, "style": "danger", "action_id": "admin_home_delete_data"}
-            ]}
-        ]
-    }
+    return _ADMIN_HOME_VIEW
 
 # --- NEW: Standard User Home Tab View Builder ---
+_USER_HOME_VIEW = {
+    "type": "home",
+    "blocks": [
+        {"type": "section", "text": {"type": "mrkdwn", "text": "Welcome to the Celebration Bot! :tada:\nI'll post messages for birthdays and work anniversaries. If I've asked for your birthday, please reply in a direct message."}},
+        {"type": "section", "text": {"type": "mrkdwn", "text": "Type `/help` in any channel to see available commands."}}
+    ]
+}
+
 def build_user_home_view():
     """Builds the simple home view for non-admin users."""
-    return {
-        "type": "home",
-        "blocks": [
-            {"type": "section", "text": {"type": "mrkdwn", "text": "Welcome to the Celebration Bot! :tada:\nI'll post messages for birthdays and work anniversaries. If I've asked for your birthday, please reply in a direct message."}},
-            {"type": "section", "text": {"type": "mrkdwn", "text": "Type `/help` in any channel to see available commands."}}
-        ]
-    }
+    return _USER_HOME_VIEW
 
 
 # --- COMMAND HANDLERS, VIEW HANDLERS, EVENT HANDLERS, MESSAGE ROUTING ---
+# /help content is fixed, so both variants are built once at import.
+_ADMIN_COMMAND_TEXT = "\n".join([
+    "• `/setup-birthdays`: Configure birthday announcements.",
+    "• `/setup-anniversary`: Configure anniversary announcements.",
+    "• `/set-anniversary`: Set a user's work start date.",
+    "• `/set-birthday`: Set a user's birthday.",
+    "• `/set-game`: Enable or disable the birthday game.",
+    "• `/list-birthdays`: List all saved birthdays.",
+    "• `/list-anniversaries`: List all saved anniversaries.",
+    "• `/test-birthday-ai`: Send a test birthday message.",
+    "• `/test-anniversary-ai`: Send a test anniversary message.",
+    "• `/test-game`: Starts a test game for yourself.",
+    "• `/delete`: Delete a user's data.",
+    "• `/add-word`: Add a word to the Wordle dictionary.",
+    "• `/reset-celebration-bot`: Reset all bot data and settings."
+])
+_HELP_BLOCKS = [{"type": "header", "text": {"type": "plain_text", "text": "Celebration Bot Help :wave:"}}, {"type": "section", "text": {"type": "mrkdwn", "text": "Here are the commands you can use:\n\n*User Commands:*\n• `/help`: Shows this help message."}}]
+_HELP_BLOCKS_ADMIN = _HELP_BLOCKS + [{"type": "divider"}, {"type": "section", "text": {"type": "mrkdwn", "text": f"*Admin Commands:*\n{_ADMIN_COMMAND_TEXT}"}}]
+
 @slack_app.command("/help")
 async def help_command(ack, body, client):
     await ack(); user_id = body['user_id']
-    admin_command_text = "\n".join([
-        "• `/setup-birthdays`: Configure birthday announcements.",
-        "• `/setup-anniversary`: Configure anniversary announcements.",
-        "• `/set-anniversary`: Set a user's work start date.",
-        "• `/set-birthday`: Set a user's birthday.",
-        "• `/set-game`: Enable or disable the birthday game.",
-        "• `/list-birthdays`: List all saved birthdays.",
-        "• `/list-anniversaries`: List all saved anniversaries.",
-        "• `/test-birthday-ai`: Send a test birthday message.",
-        "• `/test-anniversary-ai`: Send a test anniversary message.",
-        "• `/test-game`: Starts a test game for yourself.",
-        "• `/delete`: Delete a user's data.",
-        "• `/reset-celebration-bot`: Reset all bot data and settings."
-    ])
-    blocks = [{"type": "header", "text": {"type": "plain_text", "text": "Celebration Bot Help :wave:"}}, {"type": "section", "text": {"type": "mrkdwn", "text": "Here are the commands you can use:\n\n*User Commands:*\n• `/help`: Shows this help message."}}]
-    if await is_user_admin(client, user_id): blocks.append({"type": "divider"}); blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": f"*Admin Commands:*\n{admin_command_text}"}})
+    blocks = _HELP_BLOCKS_ADMIN if await is_user_admin(client, user_id) else _HELP_BLOCKS
     await client.chat_postEphemeral(user=user_id, channel=body['channel_id'], blocks=blocks, text="Here are the available commands.")
 
 @slack_app.command("/setup-birthdays")
 async def setup_birthdays_command(ack, body, client):
     await ack()
     if not await is_user_admin(client, body['user_id']): await client.chat_postEphemeral(user=body['user_id'], channel=body['channel_id'], text="Sorry, You don't have the right permmision to do this action."); return
-    try: current_settings = db_read_one("SELECT * FROM settings_birthday WHERE id = 1"); view = build_settings_modal("birthday_settings_submitted", "Birthday Settings", current_settings); view['private_metadata'] = 'from_setup'; await client.views_open(trigger_id=body["trigger_id"], view=view)
+    try: settings = await get_settings(); view = build_settings_modal("birthday_settings_submitted", "Birthday Settings", settings['bday_channel'], settings['bday_time']); view['private_metadata'] = 'from_setup'; await client.views_open(trigger_id=body["trigger_id"], view=view)
     except Exception as e: logger.error(f"Error in /setup-birthdays: {e}")
 
 @slack_app.command("/setup-anniversary")
 async def setup_anniversary_command(ack, body, client):
     await ack()
     if not await is_user_admin(client, body['user_id']): await client.chat_postEphemeral(user=body['user_id'], channel=body['channel_id'], text="Sorry, You don't have the right permmision to do this action."); return
-    try: current_settings = db_read_one("SELECT * FROM settings_anniversary WHERE id = 1"); view = build_settings_modal("anniversary_settings_submitted", "Anniversary Settings", current_settings); await client.views_open(trigger_id=body["trigger_id"], view=view)
+    try: settings = await get_settings(); view = build_settings_modal("anniversary_settings_submitted", "Anniversary Settings", settings['anniv_channel'], settings['anniv_time']); await client.views_open(trigger_id=body["trigger_id"], view=view)
     except Exception as e: logger.error(f"Error in /setup-anniversary: {e}")
 
 @slack_app.command("/set-game")
@@ -601,7 +969,7 @@ async def set_game_command(ack, body, client):
     await ack()
     if not await is_user_admin(client, body['user_id']): await client.chat_postEphemeral(user=body['user_id'], channel=body['channel_id'], text="Sorry, this is an admin-only command."); return
     try:
-        current_setting = db_read_one("SELECT enabled FROM settings_game WHERE id = 1"); current_status = current_setting[0] if current_setting else 0
+        current_status = (await get_settings())['game_enabled']
         view = build_game_settings_modal(current_status); await client.views_open(trigger_id=body["trigger_id"], view=view)
     except Exception as e: logger.error(f"Error in /set-game: {e}")
 
@@ -633,6 +1001,20 @@ async def delete_data_command(ack, body, client):
     try: view = build_delete_type_modal(); await client.views_open(trigger_id=body["trigger_id"], view=view)
     except Exception as e: logger.error(f"Error opening delete data modal: {e}")
 
+@slack_app.command("/add-word")
+async def add_word_command(ack, body, client):
+    await ack(); user_id = body['user_id']
+    if not await is_user_admin(client, user_id): await client.chat_postEphemeral(user=user_id, channel=body['channel_id'], text="Sorry, this is an admin-only command."); return
+    word = body.get('text', '').strip().upper()
+    if len(word) != 5 or not (word.isascii() and word.isalpha()):
+        await client.chat_postEphemeral(user=user_id, channel=body['channel_id'], text="Usage: `/add-word WORD` with a 5-letter word (A-Z only)."); return
+    if word in VALID_GUESSES:
+        await client.chat_postEphemeral(user=user_id, channel=body['channel_id'], text=f"*{word}* is already in the Wordle dictionary."); return
+    if await is_real_word_with_ai(word):
+        await client.chat_postEphemeral(user=user_id, channel=body['channel_id'], text=f"Added *{word}* to the Wordle dictionary.")
+    else:
+        await client.chat_postEphemeral(user=user_id, channel=body['channel_id'], text=f"*{word}* doesn't look like a real word, so I didn't add it.")
+
 # --- CORRECTED COMMAND ---
 @slack_app.command("/list-birthdays")
 async def list_birthdays_command(ack, body, client):
@@ -640,16 +1022,12 @@ async def list_birthdays_command(ack, body, client):
     if not await is_user_admin(client, user_id):
         # Send a DM instead of an ephemeral message
         await client.chat_postMessage(channel=user_id, text="Sorry, You don't have the right permission to do this action."); return
-    all_birthdays = db_read_all("SELECT user_id, birthday_date FROM birthdays")
+    all_birthdays = await db_read_all(UPCOMING_BIRTHDAYS_SQL, (today_mmdd(),))
     if not all_birthdays:
         await client.chat_postMessage(channel=user_id, text="No birthdays saved."); return
-    today_tuple = (date.today().month, date.today().day)
-    sorted_birthdays = sorted(all_birthdays, key=lambda b: (int(b[1][:2]), int(b[1][3:])) if (int(b[1][:2]), int(b[1][3:])) >= today_tuple else (int(b[1][:2]) + 12, int(b[1][3:])))
-    message = ["*Upcoming Birthdays:*"]
-    for bday_user_id, bday_str in sorted_birthdays:
-        message.append(f"• <@{bday_user_id}> - {datetime.strptime(bday_str, '%m-%d').strftime('%B %d')}")
+    text = "*Upcoming Birthdays:*\n" + "\n".join(f"• <@{bday_user_id}> - {MONTH_NAMES[int(bday_str[:2])]} {bday_str[3:5]}" for bday_user_id, bday_str in all_birthdays)
     # Send the list as a direct message to the user
-    await client.chat_postMessage(channel=user_id, text="\n".join(message))
+    await client.chat_postMessage(channel=user_id, text=text)
 
 # --- CORRECTED COMMAND ---
 @slack_app.command("/list-anniversaries")
@@ -657,15 +1035,10 @@ async def list_anniversaries_command(ack, body, client):
     await ack(); user_id = body['user_id']
     if not await is_user_admin(client, user_id):
         await client.chat_postMessage(channel=user_id, text="Sorry, You don't have the right permission to do this action."); return
-    all_anniversaries = db_read_all("SELECT user_id, anniversary_date FROM anniversaries")
+    all_anniversaries = await db_read_all(UPCOMING_ANNIVERSARIES_SQL, (today_mmdd(),))
     if not all_anniversaries:
         await client.chat_postMessage(channel=user_id, text="No anniversaries saved."); return
-    today = date.today(); today_tuple = (today.month, today.day)
-    sorted_anniversaries = sorted(all_anniversaries, key=lambda a: (int(a[1][5:7]), int(a[1][8:10])) if (int(a[1][5:7]), int(a[1][8:10])) >= today_tuple else (int(a[1][5:7]) + 12, int(a[1][8:10])))
-    message = ["*Upcoming Anniversaries:*"]
-    for anniv_user_id, anniv_str in sorted_anniversaries:
-        anniv_obj = datetime.strptime(anniv_str, "%Y-%m-%d").date(); years = relativedelta(today, anniv_obj).years
-        if years >= 1: message.append(f"• <@{anniv_user_id}> - {anniv_obj.strftime('%B %d %Y')} ({years}-year anniversary)")
+    message = ["*Upcoming Anniversaries:*"] + upcoming_anniversary_lines(all_anniversaries)
     if len(message) == 1:
         await client.chat_postMessage(channel=user_id, text="No upcoming anniversaries for anyone who has been here at least a year.")
     else:
@@ -676,6 +1049,9 @@ async def list_anniversaries_command(ack, body, client):
 @slack_app.command("/test-birthday-ai")
 async def test_birthday_ai_command(ack, body, client):
     await ack()
+    run_in_background(_test_birthday_ai(body, client), "/test-birthday-ai")
+
+async def _test_birthday_ai(body, client):
     user_id = body['user_id']
     if not await is_user_admin(client, user_id):
         await client.chat_postEphemeral(user=user_id, channel=body['channel_id'], text="Sorry, you don't have permission to do this.")
@@ -694,18 +1070,21 @@ async def test_birthday_ai_command(ack, body, client):
 @slack_app.command("/test-anniversary-ai")
 async def test_anniversary_ai_command(ack, body, client):
     await ack()
+    run_in_background(_test_anniversary_ai(body, client), "/test-anniversary-ai")
+
+async def _test_anniversary_ai(body, client):
     user_id = body['user_id']
     if not await is_user_admin(client, user_id):
         await client.chat_postEphemeral(user=user_id, channel=body['channel_id'], text="Sorry, you don't have permission to do this.")
         return
-    anniv_data = db_read_one("SELECT anniversary_date FROM anniversaries WHERE user_id = ?", (user_id,))
+    anniv_data = await db_read_one("SELECT anniversary_date FROM anniversaries WHERE user_id = ?", (user_id,))
     if not anniv_data:
         await client.chat_postEphemeral(user=user_id, channel=body['channel_id'], text="Cannot run test: Your anniversary date is not in the database. An admin can set it with `/set-anniversary`.")
         return
     await client.chat_postEphemeral(user=user_id, channel=body['channel_id'], text="Generating a test AI anniversary message based on your saved start date...")
     try:
-        anniv_date = datetime.strptime(anniv_data[0], "%Y-%m-%d").date()
-        years = relativedelta(date.today(), anniv_date).years
+        anniv_date = date.fromisoformat(anniv_data[0])
+        years = completed_years(date.today(), anniv_date)
         if years == 0:
             await client.chat_postEphemeral(user=user_id, channel=body['channel_id'], text="Cannot run test: Your start date is less than a year ago.")
             return
@@ -723,8 +1102,7 @@ async def test_game_command(ack, body, client):
     if not await is_user_admin(client, user_id):
         await client.chat_postEphemeral(user=user_id, channel=body['channel_id'], text="Sorry, this is an admin-only command.")
         return
-    game_setting = db_read_one("SELECT enabled FROM settings_game WHERE id = 1")
-    game_enabled = game_setting[0] if game_setting else 0
+    game_enabled = (await get_settings())['game_enabled']
     if not game_enabled:
         await client.chat_postEphemeral(user=user_id, channel=body['channel_id'], text="The birthday games are currently disabled. Please enable them first using `/set-game`.")
         return
@@ -740,8 +1118,8 @@ async def handle_birthday_settings_submission(ack, body, client, view):
     user_id = body["user"]["id"]; values = view["state"]["values"]
     try:
         channel, time = values["channel_block"]["channel_select_action"]["selected_channel"], values["time_block"]["time_select_action"]["selected_time"]
-        db_write("INSERT OR REPLACE INTO settings_birthday (id, announcement_channel, announcement_time) VALUES (?, ?, ?)", (1, channel, time))
-        channel_name = await get_channel_name(client, channel); confirmation_msg = f"Birthday settings saved! Announcements will be in `#{channel_name}` at `{time}`."
+        await update_settings(bday_channel=channel, bday_time=time)
+        confirmation_msg = f"Birthday settings saved! Announcements will be in <#{channel}> at `{time}`."  # Slack renders the mention as the channel name
         await ack(); await client.chat_postMessage(channel=user_id, text=confirmation_msg); await update_scheduler()
         if view.get('private_metadata') == 'from_setup': await client.chat_postMessage(channel=user_id, text="Now collecting birthdays..."); await ask_for_all_birthdays(client)
     except SlackApiError as e:
@@ -754,8 +1132,8 @@ async def handle_anniversary_settings_submission(ack, body, client, view):
     user_id = body["user"]["id"]; values = view["state"]["values"]
     try:
         channel, time = values["channel_block"]["channel_select_action"]["selected_channel"], values["time_block"]["time_select_action"]["selected_time"]
-        db_write("INSERT OR REPLACE INTO settings_anniversary (id, announcement_channel, announcement_time) VALUES (?, ?, ?)", (1, channel, time))
-        channel_name = await get_channel_name(client, channel); confirmation_msg = f"Anniversary settings saved! Announcements will be in `#{channel_name}` at `{time}`."
+        await update_settings(anniv_channel=channel, anniv_time=time)
+        confirmation_msg = f"Anniversary settings saved! Announcements will be in <#{channel}> at `{time}`."  # Slack renders the mention as the channel name
         await ack(); await client.chat_postMessage(channel=user_id, text=confirmation_msg); await update_scheduler()
     except SlackApiError as e:
         if e.response["error"] == "not_in_channel": await ack(response_action="errors", errors={"channel_block": "I can't post here. Please `/invite` me."})
@@ -767,7 +1145,7 @@ async def handle_game_settings_submission(ack, body, client, view):
     user_id = body["user"]["id"]; values = view["state"]["values"]
     try:
         status = int(values["game_status_block"]["game_status_action"]["selected_option"]["value"])
-        db_write("INSERT OR REPLACE INTO settings_game (id, enabled) VALUES (1, ?)", (status,))
+        await update_settings(game_enabled=status)
         status_text = "enabled" if status == 1 else "disabled"; confirmation_msg = f"The Birthday Games have been *{status_text}*."
         await ack(); await client.chat_postMessage(channel=user_id, text=confirmation_msg)
     except Exception as e: logger.error(f"Error in game settings submission: {e}"); await ack(); await client.chat_postMessage(channel=user_id, text=f"An error occurred: {e}")
@@ -775,7 +1153,7 @@ async def handle_game_settings_submission(ack, body, client, view):
 @slack_app.view("reset_confirmed")
 async def handle_reset_confirmation(ack, body, client):
     user_id = body["user"]["id"]
-    try: await ack(); db_reset(); await update_scheduler(); logger.info(f"Database reset by user {user_id}"); await client.chat_postMessage(channel=user_id, text="The Celebration Bot has been fully reset.")
+    try: await ack(); await db_reset(); await update_scheduler(); logger.info(f"Database reset by user {user_id}"); await client.chat_postMessage(channel=user_id, text="The Celebration Bot has been fully reset.")
     except Exception as e: logger.error(f"Error during reset confirmation: {e}")
 
 @slack_app.view("admin_set_birthday_submitted")
@@ -787,17 +1165,17 @@ async def handle_admin_set_birthday_submission(ack, body, client, view):
         date_str = values["date_input_block"]["date_input_action"]["value"]
         
         # FIX APPLIED HERE
-        format_string_with_year = "%m-%d-%Y" if selected_format == "MM-DD" else "%d-%m-%Y"
+        format_string_with_year = MMDD_INPUT_FORMAT if selected_format == "MM-DD" else DDMM_INPUT_FORMAT
         date_str_with_year = f"{date_str}-2000" # Use a leap year
         
         parsed_date = datetime.strptime(date_str_with_year, format_string_with_year)
         db_date_str = parsed_date.strftime("%m-%d")
         
-        db_write("INSERT OR REPLACE INTO birthdays (user_id, birthday_date) VALUES (?, ?)", (target_user_id, db_date_str))
+        await db_write("INSERT OR REPLACE INTO birthdays (user_id, birthday_date) VALUES (?, ?)", (target_user_id, db_date_str))
         await ack()
-        await client.chat_postMessage(channel=admin_user_id, text=f"Success! Birthday for <@{target_user_id}> set to {parsed_date.strftime('%B %d')}.")
+        await client.chat_postMessage(channel=admin_user_id, text=f"Success! Birthday for <@{target_user_id}> set to {format_month_day(parsed_date)}.")
         try:
-            await client.chat_postMessage(channel=target_user_id, text=f"FYI: An admin set your birthday to {parsed_date.strftime('%B %d')}.")
+            await client.chat_postMessage(channel=target_user_id, text=f"FYI: An admin set your birthday to {format_month_day(parsed_date)}.")
         except Exception:
             pass
     except ValueError:
@@ -813,7 +1191,7 @@ async def handle_admin_set_anniversary_submission(ack, body, client, view):
     try:
         target_user_id, date_str = values["user_select_block"]["user_select_action"]["selected_user"], values["date_input_block"]["date_input_action"]["selected_date"]
         if not date_str: await ack(response_action="errors", errors={"date_input_block": "A date must be selected."}); return
-        db_write("INSERT OR REPLACE INTO anniversaries (user_id, anniversary_date) VALUES (?, ?)", (target_user_id, date_str))
+        await db_write("INSERT OR REPLACE INTO anniversaries (user_id, anniversary_date) VALUES (?, ?)", (target_user_id, date_str))
         await ack(); await client.chat_postMessage(channel=admin_user_id, text=f"Success! Anniversary for <@{target_user_id}> set to {date_str}.")
         try: await client.chat_postMessage(channel=target_user_id, text=f"FYI: An admin has set your work anniversary date to {date_str}.")
         except Exception: pass
@@ -830,13 +1208,13 @@ async def handle_delete_type_selection(ack, body, client):
 @slack_app.view("delete_birthday_confirmed")
 async def handle_delete_birthday(ack, body, client):
     admin_user_id = body['user']['id']; user_to_delete = body['view']['state']['values']['user_select_block']['user_select_action']['selected_option']['value']
-    db_write("DELETE FROM birthdays WHERE user_id = ?", (user_to_delete,))
+    await db_write("DELETE FROM birthdays WHERE user_id = ?", (user_to_delete,))
     await ack(); await client.chat_postMessage(channel=admin_user_id, text=f"Deleted birthday for <@{user_to_delete}>.")
 
 @slack_app.view("delete_anniversary_confirmed")
 async def handle_delete_anniversary(ack, body, client):
     admin_user_id = body['user']['id']; user_to_delete = body['view']['state']['values']['user_select_block']['user_select_action']['selected_option']['value']
-    db_write("DELETE FROM anniversaries WHERE user_id = ?", (user_to_delete,))
+    await db_write("DELETE FROM anniversaries WHERE user_id = ?", (user_to_delete,))
     await ack(); await client.chat_postMessage(channel=admin_user_id, text=f"Deleted anniversary for <@{user_to_delete}>.")
 
 @slack_app.view("test_game_selected")
@@ -861,8 +1239,8 @@ async def handle_admin_home_setup_birthdays(ack, body, client):
     await ack()
     # This logic is identical to the /setup-birthdays command
     try:
-        current_settings = db_read_one("SELECT * FROM settings_birthday WHERE id = 1")
-        view = build_settings_modal("birthday_settings_submitted", "Birthday Settings", current_settings)
+        settings = await get_settings()
+        view = build_settings_modal("birthday_settings_submitted", "Birthday Settings", settings['bday_channel'], settings['bday_time'])
         await client.views_open(trigger_id=body["trigger_id"], view=view)
     except Exception as e:
         logger.error(f"Error in admin_home_setup_birthdays action: {e}")
@@ -872,8 +1250,8 @@ async def handle_admin_home_setup_anniversaries(ack, body, client):
     await ack()
     # This logic is identical to the /setup-anniversary command
     try:
-        current_settings = db_read_one("SELECT * FROM settings_anniversary WHERE id = 1")
-        view = build_settings_modal("anniversary_settings_submitted", "Anniversary Settings", current_settings)
+        settings = await get_settings()
+        view = build_settings_modal("anniversary_settings_submitted", "Anniversary Settings", settings['anniv_channel'], settings['anniv_time'])
         await client.views_open(trigger_id=body["trigger_id"], view=view)
     except Exception as e:
         logger.error(f"Error in admin_home_setup_anniversaries action: {e}")
@@ -883,8 +1261,7 @@ async def handle_admin_home_setup_games(ack, body, client):
     await ack()
     # This logic is identical to the /set-game command
     try:
-        current_setting = db_read_one("SELECT enabled FROM settings_game WHERE id = 1")
-        current_status = current_setting[0] if current_setting else 0
+        current_status = (await get_settings())['game_enabled']
         view = build_game_settings_modal(current_status)
         await client.views_open(trigger_id=body["trigger_id"], view=view)
     except Exception as e:
@@ -925,16 +1302,12 @@ async def handle_admin_home_list_birthdays(ack, body, client):
     await ack()
     user_id = body['user']['id']
     # This logic is identical to the /list-birthdays command
-    all_birthdays = db_read_all("SELECT user_id, birthday_date FROM birthdays")
+    all_birthdays = await db_read_all(UPCOMING_BIRTHDAYS_SQL, (today_mmdd(),))
     if not all_birthdays:
         await client.chat_postMessage(channel=user_id, text="No birthdays saved.")
         return
-    today_tuple = (date.today().month, date.today().day)
-    sorted_birthdays = sorted(all_birthdays, key=lambda b: (int(b[1][:2]), int(b[1][3:])) if (int(b[1][:2]), int(b[1][3:])) >= today_tuple else (int(b[1][:2]) + 12, int(b[1][3:])))
-    message = ["*Upcoming Birthdays:*"]
-    for bday_user_id, bday_str in sorted_birthdays:
-        message.append(f"• <@{bday_user_id}> - {datetime.strptime(bday_str, '%m-%d').strftime('%B %d')}")
-    await client.chat_postMessage(channel=user_id, text="\n".join(message))
+    text = "*Upcoming Birthdays:*\n" + "\n".join(f"• <@{bday_user_id}> - {MONTH_NAMES[int(bday_str[:2])]} {bday_str[3:5]}" for bday_user_id, bday_str in all_birthdays)
+    await client.chat_postMessage(channel=user_id, text=text)
 
 
 @slack_app.action("admin_home_list_anniversaries")
@@ -942,16 +1315,11 @@ async def handle_admin_home_list_anniversaries(ack, body, client):
     await ack()
     user_id = body['user']['id']
     # This logic is identical to the /list-anniversaries command
-    all_anniversaries = db_read_all("SELECT user_id, anniversary_date FROM anniversaries")
+    all_anniversaries = await db_read_all(UPCOMING_ANNIVERSARIES_SQL, (today_mmdd(),))
     if not all_anniversaries:
         await client.chat_postMessage(channel=user_id, text="No anniversaries saved.")
         return
-    today = date.today(); today_tuple = (today.month, today.day)
-    sorted_anniversaries = sorted(all_anniversaries, key=lambda a: (int(a[1][5:7]), int(a[1][8:10])) if (int(a[1][5:7]), int(a[1][8:10])) >= today_tuple else (int(a[1][5:7]) + 12, int(a[1][8:10])))
-    message = ["*Upcoming Anniversaries:*"]
-    for anniv_user_id, anniv_str in sorted_anniversaries:
-        anniv_obj = datetime.strptime(anniv_str, "%Y-%m-%d").date(); years = relativedelta(today, anniv_obj).years
-        if years >= 1: message.append(f"• <@{anniv_user_id}> - {anniv_obj.strftime('%B %d %Y')} ({years}-year anniversary)")
+    message = ["*Upcoming Anniversaries:*"] + upcoming_anniversary_lines(all_anniversaries)
     if len(message) == 1:
         await client.chat_postMessage(channel=user_id, text="No upcoming anniversaries for anyone who has been here at least a year.")
     else:
@@ -962,8 +1330,7 @@ async def handle_admin_home_test_game(ack, body, client):
     await ack()
     user_id = body['user']['id']
     # This logic is identical to the /test-game command
-    game_setting = db_read_one("SELECT enabled FROM settings_game WHERE id = 1")
-    game_enabled = game_setting[0] if game_setting else 0
+    game_enabled = (await get_settings())['game_enabled']
     if not game_enabled:
         await client.chat_postMessage(channel=user_id, text="The birthday games are currently disabled. Please enable them first.")
         return
@@ -977,6 +1344,9 @@ async def handle_admin_home_test_game(ack, body, client):
 @slack_app.action("admin_home_test_bday_ai")
 async def handle_admin_home_test_bday_ai(ack, body, client):
     await ack()
+    run_in_background(_admin_home_test_bday_ai(body, client), "admin_home_test_bday_ai")
+
+async def _admin_home_test_bday_ai(body, client):
     user_id = body['user']['id']
     # This logic is identical to the modified /test-birthday-ai command
     await client.chat_postMessage(channel=user_id, text="Generating a test AI birthday message for you...")
@@ -990,16 +1360,19 @@ async def handle_admin_home_test_bday_ai(ack, body, client):
 @slack_app.action("admin_home_test_anniv_ai")
 async def handle_admin_home_test_anniv_ai(ack, body, client):
     await ack()
+    run_in_background(_admin_home_test_anniv_ai(body, client), "admin_home_test_anniv_ai")
+
+async def _admin_home_test_anniv_ai(body, client):
     user_id = body['user']['id']
     # This logic is identical to the modified /test-anniversary-ai command
-    anniv_data = db_read_one("SELECT anniversary_date FROM anniversaries WHERE user_id = ?", (user_id,))
+    anniv_data = await db_read_one("SELECT anniversary_date FROM anniversaries WHERE user_id = ?", (user_id,))
     if not anniv_data:
         await client.chat_postMessage(channel=user_id, text="Cannot run test: Your anniversary date is not in the database. Please set it first.")
         return
     await client.chat_postMessage(channel=user_id, text="Generating a test AI anniversary message based on your saved start date...")
     try:
-        anniv_date = datetime.strptime(anniv_data[0], "%Y-%m-%d").date()
-        years = relativedelta(date.today(), anniv_date).years
+        anniv_date = date.fromisoformat(anniv_data[0])
+        years = completed_years(date.today(), anniv_date)
         if years == 0:
             await client.chat_postMessage(channel=user_id, text="Cannot run test: Your start date is less than a year ago.")
             return
@@ -1039,6 +1412,7 @@ async def update_home_tab(client, event, logger):
 @slack_app.event("team_join")
 async def handle_team_join(event, client):
     new_user_id = event["user"]["id"]; logger.info(f"New user joined: {new_user_id}")
+    _cache_user(event["user"])
     try:
         # Ask the new user for their birthday
         format_str, example_str = await get_user_date_format(client, new_user_id)
@@ -1046,14 +1420,7 @@ async def handle_team_join(event, client):
 
         # Notify admins more efficiently
         admin_reminder_message = f":wave: A new user, <@{new_user_id}>, has joined! Please remember to set their work anniversary using the `/set-anniversary` command or the Admin Control Panel in my App Home."
-        all_users_response = await client.users_list()
-        for user in all_users_response['members']:
-            # Check admin/owner status directly from the users.list response
-            if not user['is_bot'] and (user.get('is_admin') or user.get('is_owner')):
-                try:
-                    await client.chat_postMessage(channel=user['id'], text=admin_reminder_message)
-                except Exception as e:
-                    logger.error(f"Failed to send admin reminder to {user['id']}: {e}")
+        run_in_background(notify_admins(client, admin_reminder_message), "team_join admin reminder")
     except Exception as e:
         logger.error(f"Error in team_join event for {new_user_id}: {e}")
 
@@ -1061,23 +1428,17 @@ async def handle_team_join(event, client):
 @slack_app.event("user_change")
 async def handle_user_change(event, client):
     user_profile = event["user"]
+    # The event carries the updated user object, so refresh the caches with it (admin bits included).
+    _cache_user(user_profile)  # also drops deactivated users from the admin set
     if user_profile.get("deleted", False):
         user_id = user_profile["id"]; logger.info(f"User {user_id} has been deactivated. Removing their data.")
-        db_write("DELETE FROM birthdays WHERE user_id = ?", (user_id,))
-        db_write("DELETE FROM anniversaries WHERE user_id = ?", (user_id,))
+        _USER_CACHE.pop(user_id, None); _ADMIN_CACHE.pop(user_id, None); _DATE_FORMAT_CACHE.pop(user_id, None)
+        await db_write("DELETE FROM birthdays WHERE user_id = ?", (user_id,))
+        await db_write("DELETE FROM anniversaries WHERE user_id = ?", (user_id,))
 
         # Notify admins more efficiently
         admin_reminder_message = f"User <@{user_id}> has been deactivated and their data has been removed from the Celebration Bot."
-        try:
-            all_users_response = await client.users_list()
-            for user in all_users_response['members']:
-                if not user['is_bot'] and (user.get('is_admin') or user.get('is_owner')):
-                    try:
-                        await client.chat_postMessage(channel=user['id'], text=admin_reminder_message)
-                    except Exception as e:
-                        logger.error(f"Failed to send admin reminder to {user['id']}: {e}")
-        except Exception as e:
-            logger.error(f"Error notifying admins during user_change for {user_id}: {e}")
+        run_in_background(notify_admins(client, admin_reminder_message), f"user_change admin notice for {user_id}")
 
 @slack_app.message()
 async def handle_dm(message, say, client):
@@ -1091,24 +1452,22 @@ async def handle_dm(message, say, client):
         await handler_function(text.upper(), user_id, game_session, say)
         return
         
-    birthday_match = re.fullmatch(r"(\d{2}-\d{2})", text)
-    if birthday_match:
-        date_str = birthday_match.group(1)
-        if db_read_one("SELECT 1 FROM birthdays WHERE user_id = ?", (user_id,)):
+    if _BDAY_RE.fullmatch(text):
+        date_str = text
+        if await db_read_one("SELECT 1 FROM birthdays WHERE user_id = ?", (user_id,)):
             await say("I already have your birthday saved! Ask an admin to update it if it's incorrect.")
             return
         try:
             date_format, _ = await get_user_date_format(client, user_id)
             
-            # FIX APPLIED HERE
-            format_string_with_year = "%d-%m-%Y" if date_format == 'DD-MM' else "%m-%d-%Y"
-            date_str_with_year = f"{date_str}-2000" # Use a leap year to be safe
+            # _BDAY_RE already guarantees 'NN-NN', so reorder into ISO form and use the C-level fromisoformat.
+            first, second = date_str[:2], date_str[3:]
+            month, day = (second, first) if date_format == 'DD-MM' else (first, second)
+            parsed_date = date.fromisoformat(f"2000-{month}-{day}") # Use a leap year to be safe; raises ValueError if invalid
+            db_date_str = f"{month}-{day}" # Store without the year
             
-            parsed_date = datetime.strptime(date_str_with_year, format_string_with_year)
-            db_date_str = parsed_date.strftime("%m-%d") # Store without the year
-            
-            db_write("INSERT INTO birthdays (user_id, birthday_date) VALUES (?, ?)", (user_id, db_date_str))
-            await say(f"Got it! I'll celebrate your birthday on {parsed_date.strftime('%B %d')}!")
+            await db_write("INSERT INTO birthdays (user_id, birthday_date) VALUES (?, ?)", (user_id, db_date_str))
+            await say(f"Got it! I'll celebrate your birthday on {format_month_day(parsed_date)}!")
         except ValueError:
             await say("That date is invalid or in the wrong format. Please try again.")
         except Exception as e:
@@ -1116,89 +1475,147 @@ async def handle_dm(message, say, client):
         return
 
 async def ask_for_all_birthdays(client):
+    async def _dm_one(user):
+        async with _dm_sem:
+            try:
+                format_str, example_str = await get_user_date_format(client, user['id'])
+                response = await client.conversations_open(users=user["id"])
+                await client.chat_postMessage(channel=response["channel"]["id"], text=f"Hi! I'm the new Celebration Bot. To get started, please reply with your birthday in `{format_str}` format ({example_str}).")
+            except Exception as e: logger.error(f"Error sending DM to {user['id']}: {e}")
     try:
-        result = await client.users_list()
-        for user in result["members"]:
-            if not user["is_bot"] and user["id"] != "USLACKBOT" and not db_read_one("SELECT 1 FROM birthdays WHERE user_id = ?", (user['id'],)):
-                try:
-                    format_str, example_str = await get_user_date_format(client, user['id'])
-                    response = await client.conversations_open(users=user["id"])
-                    await client.chat_postMessage(channel=response["channel"]["id"], text=f"Hi! I'm the new Celebration Bot. To get started, please reply with your birthday in `{format_str}` format ({example_str}).")
-                except Exception as e: logger.error(f"Error sending DM to {user['id']}: {e}")
+        existing = {user_id for (user_id,) in await db_read_all("SELECT user_id FROM birthdays")}
+        # DMs for each page start while the next page is being fetched; the semaphore bounds them overall.
+        tasks = []
+        async for user in iter_members(client):
+            if user["is_bot"] or user["id"] == "USLACKBOT" or user["id"] in existing: continue
+            _cache_user(user)  # get_user_date_format then needs no users_info call
+            tasks.append(asyncio.create_task(_dm_one(user)))
+        await asyncio.gather(*tasks)
     except Exception as e: logger.error(f"Error fetching users: {e}")
 
+# Bounds how many celebrants are processed at once by the daily checks.
+CELEBRATION_CONCURRENCY = 10
+
+async def _run_bounded(coros, limit, label):
+    """Runs coroutines concurrently under a semaphore and logs any that failed."""
+    sem = asyncio.Semaphore(limit)
+    async def _bounded(coro):
+        async with sem: return await coro
+    results = await asyncio.gather(*(_bounded(c) for c in coros), return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception): logger.critical(f"CRITICAL ERROR during {label}: {result}")
+
 async def daily_birthday_check():
-    settings = db_read_one("SELECT * FROM settings_birthday WHERE id = 1")
-    if not settings: return
-    _, channel, _ = settings
-    today_str = date.today().strftime("%m-%d")
-    birthdays_today = db_read_all("SELECT user_id FROM birthdays WHERE birthday_date = ?", (today_str,))
-    game_setting = db_read_one("SELECT enabled FROM settings_game WHERE id = 1")
-    game_enabled = game_setting[0] if game_setting else 0
-    for (user_id,) in birthdays_today:
+    settings = await get_settings()
+    channel = settings['bday_channel']
+    if not channel: return
+    today_str = today_mmdd()
+    birthdays_today = await db_read_all("SELECT user_id FROM birthdays WHERE birthday_date = ?", (today_str,))
+    game_enabled = settings['game_enabled']
+    async def _celebrate(user_id):
         try:
             message = await generate_birthday_message(user_id)
-            await slack_app.client.chat_postMessage(channel=channel, text=message)
-            if game_enabled:
-                game_keys = list(GAME_REGISTRY.keys())
-                chosen_game_key = random.choice(game_keys)
+            await slack_client.chat_postMessage(channel=channel, text=message)
+            if game_enabled and _GAME_KEYS:
+                chosen_game_key = random.choice(_GAME_KEYS)
                 logger.info(f"Randomly selected game '{chosen_game_key}' for birthday user {user_id}")
                 start_function = GAME_REGISTRY[chosen_game_key]['start']
-                await start_function(user_id, slack_app.client)
+                await start_function(user_id, slack_client)
         except Exception as e:
-            logger.critical(f"CRITICAL ERROR during daily_birthday_check for {user_id}: {e}")
+            raise RuntimeError(f"{user_id}: {e}") from e
+    await _run_bounded([_celebrate(user_id) for (user_id,) in birthdays_today], CELEBRATION_CONCURRENCY, "daily_birthday_check")
 
 async def daily_anniversary_check():
-    settings = db_read_one("SELECT * FROM settings_anniversary WHERE id = 1")
-    if not settings: return
-    _, channel, _ = settings
-    today_str = date.today().strftime("%m-%d")
-    anniversaries_today = db_read_all("SELECT user_id, anniversary_date FROM anniversaries WHERE SUBSTR(anniversary_date, 6) = ?", (today_str,))
-    for user_id, anniv_str in anniversaries_today:
+    settings = await get_settings()
+    channel = settings['anniv_channel']
+    if not channel: return
+    today_str = today_mmdd()
+    anniversaries_today = await db_read_all("SELECT user_id, anniversary_date FROM anniversaries WHERE SUBSTR(anniversary_date, 6) = ?", (today_str,))
+    this_year = date.today().year
+    async def _celebrate(user_id, anniv_str):
         try:
-            anniv_date = datetime.strptime(anniv_str, "%Y-%m-%d").date()
-            years = relativedelta(date.today(), anniv_date).years
+            years = this_year - int(anniv_str[:4])  # the row's month-day is today, so no partial year to subtract
             if years > 0:
                 message = await generate_anniversary_message(user_id, years)
-                await slack_app.client.chat_postMessage(channel=channel, text=message)
-        except Exception as e: logger.critical(f"CRITICAL ERROR during daily_anniversary_check for {user_id}: {e}")
+                await slack_client.chat_postMessage(channel=channel, text=message)
+        except Exception as e:
+            raise RuntimeError(f"{user_id}: {e}") from e
+    await _run_bounded([_celebrate(user_id, anniv_str) for user_id, anniv_str in anniversaries_today], CELEBRATION_CONCURRENCY, "daily_anniversary_check")
+
+# --- DAILY SCHEDULE ---
+# Each daily check has its own loop that sleeps until the configured wall-clock time. Sleeps are capped at an
+# hour so DST changes or a suspended host only delay a run until the next re-plan. update_scheduler() wakes a
+# loop when its time setting changes.
+_DAILY_JOBS = {'birthday': (daily_birthday_check, 'bday_time'), 'anniversary': (daily_anniversary_check, 'anniv_time')}
+_schedule_wakeups = {kind: asyncio.Event() for kind in _DAILY_JOBS}
+_scheduled_times = dict.fromkeys(_DAILY_JOBS)  # kind -> 'HH:MM' its loop is currently waiting for
+MAX_SCHEDULE_SLEEP = 3600
+SCHEDULE_RETRY_DELAY = 60  # back-off after a failed settings read or a malformed time
+
+def _next_fire(time_str, now):
+    hour, minute = map(int, time_str.split(':'))
+    fire = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return fire if fire > now else fire + timedelta(days=1)
+
+async def _daily_loop(kind):
+    func, setting = _DAILY_JOBS[kind]; wakeup = _schedule_wakeups[kind]
+    fire = None
+    while True:
+        wakeup.clear()
+        try:
+            time_str = _scheduled_times[kind] = (await get_settings())[setting]
+            if time_str:
+                now = datetime.now()
+                if fire is None or fire.strftime("%H:%M") != time_str: fire = _next_fire(time_str, now)
+        except Exception as e:
+            logger.error(f"Error planning the {kind} daily check, retrying in {SCHEDULE_RETRY_DELAY}s: {e}")
+            fire = None; await asyncio.sleep(SCHEDULE_RETRY_DELAY); continue
+        if not time_str:
+            fire = None; await wakeup.wait(); continue
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=min(max((fire - now).total_seconds(), 0), MAX_SCHEDULE_SLEEP))
+            fire = None; continue  # settings changed; plan again from the new time
+        except asyncio.TimeoutError: pass
+        if datetime.now() < fire: continue
+        fire = None
+        try: await func()
+        except Exception as e: logger.critical(f"CRITICAL ERROR during {kind} daily check: {e}")
 
 async def update_scheduler():
-    bday_settings = db_read_one("SELECT announcement_time FROM settings_birthday WHERE id = 1")
-    anniv_settings = db_read_one("SELECT announcement_time FROM settings_anniversary WHERE id = 1")
-    bday_job = scheduler.get_job('daily_bday_check')
-    anniv_job = scheduler.get_job('daily_anniv_check')
-
-    if bday_settings:
-        hour, minute = map(int, bday_settings[0].split(':'))
-        if bday_job: scheduler.reschedule_job('daily_bday_check', trigger='cron', hour=hour, minute=minute)
-        else: scheduler.add_job(daily_birthday_check, 'cron', hour=hour, minute=minute, id='daily_bday_check')
-        logger.info(f"Birthday scheduler set for {hour:02d}:{minute:02d} daily.")
-    elif bday_job:
-        scheduler.remove_job('daily_bday_check'); logger.info("Birthday settings not found. Scheduler stopped.")
-
-    if anniv_settings:
-        hour, minute = map(int, anniv_settings[0].split(':'))
-        if anniv_job: scheduler.reschedule_job('daily_anniv_check', trigger='cron', hour=hour, minute=minute)
-        else: scheduler.add_job(daily_anniversary_check, 'cron', hour=hour, minute=minute, id='daily_anniv_check')
-        logger.info(f"Anniversary scheduler set for {hour:02d}:{minute:02d} daily.")
-    elif anniv_job:
-        scheduler.remove_job('daily_anniv_check'); logger.info("Anniversary settings not found. Scheduler stopped.")
+    """Wakes any daily loop whose configured time differs from the one it is waiting for."""
+    settings = await get_settings()
+    for kind, (_, setting) in _DAILY_JOBS.items():
+        if settings[setting] == _scheduled_times[kind]: continue
+        _schedule_wakeups[kind].set()
+        if settings[setting]: logger.info(f"{kind.capitalize()} check scheduled for {settings[setting]} daily.")
+        else: logger.info(f"{kind.capitalize()} settings not found. Schedule stopped.")
 
 # --- App bootstrap (Socket Mode) ---
+_schedule_tasks = []  # the daily-check and admin-refresh loops, cancelled on shutdown
+
 async def _shutdown():
     logger.info("Shutting down...")
-    try:
-        scheduler.shutdown()
-    except Exception:
-        pass
+    for task in _schedule_tasks: task.cancel()
+    if HTTP is not None:
+        await HTTP.close()
+    if slack_app.client.session is not None:
+        await slack_app.client.session.close()
+    if DB_READ is not None:
+        DB_READ.close()
+    if DB is not None:
+        DB.close()
     logger.info("Shutdown complete.")
 
 async def main():
+    global HTTP
     logger.info("Starting up...")
     setup_database()
-    scheduler.start()
-    await update_scheduler()
+    HTTP = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10), connector=aiohttp.TCPConnector(limit=10))
+    # Give the Slack web client a long-lived session that encodes JSON bodies with orjson.
+    # slack_sdk only applies its own timeout to sessions it creates, so carry it over here.
+    slack_app.client.session = aiohttp.ClientSession(json_serialize=_json_dumps, timeout=aiohttp.ClientTimeout(total=slack_app.client.timeout))
+    _schedule_tasks.extend(run_in_background(_daily_loop(kind), f"{kind} schedule") for kind in _DAILY_JOBS)
+    _schedule_tasks.append(run_in_background(_admin_refresh_loop(), "admin cache refresh"))
     logger.info("Startup complete.")
 
     # Start Socket Mode (requires SLACK_APP_TOKEN)